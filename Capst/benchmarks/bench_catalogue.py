@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from run_benchmarks import make_corpus, percentiles, timed_calls
+
+# =========================
+# DATAFRAME PENUH vs KATALOG ARROW
+# =========================
+# Memori per worker dan waktu load engine dari artifact yang sudah ada:
+#   df      -> df_agg.pkl lengkap (termasuk clean_review) seperti sebelumnya
+#   catalog -> katalog Arrow (mmap) + segment_match tersimpan, tanpa teks
+# Setiap mode dijalankan di proses baru. RssAnon = memori privat proses
+# (heap Python/NumPy); RssFile = halaman file mmap yang dibagi antar worker.
+#   python benchmarks/bench_catalogue.py --scales 1,10
+
+
+def memory_mb():
+    out = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    out[key] = int(value.split()[0]) / 1024
+    except OSError:
+        # Bukan Linux: hanya peak RSS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        out["VmRSS"] = rss / (2**20 if sys.platform == "darwin" else 2**10)
+    return out
+
+
+def run_child(mode, csv_path, cache_dir, n_queries, seed):
+    from src.embedding import HashingEncoder
+    from src.engine import RecommenderEngine
+
+    encoder = HashingEncoder()
+    before = memory_mb()
+    start = time.perf_counter()
+    engine = RecommenderEngine.build(
+        csv_path=csv_path, cache_dir=cache_dir, encoder=encoder, catalogue=mode == "catalog"
+    )
+    load_s = time.perf_counter() - start
+    after = memory_mb()
+
+    rng = np.random.default_rng(seed)
+    areas = [engine.area_index.keys[j] for j in rng.integers(0, len(engine.area_index.keys), size=n_queries)]
+    segments = [engine.segments[j] for j in rng.integers(0, len(engine.segments), size=n_queries)]
+    ms = percentiles(timed_calls(
+        lambda s, a: engine.recommend("kopi enak tempat nyaman", s, a, top_k=5), zip(segments, areas)
+    ))
+
+    return {
+        "mode": mode,
+        "shops": len(engine),
+        "load_s": load_s,
+        # Mode katalog tidak punya DataFrame metadata di heap
+        "df_mb": float(engine.df.memory_usage(deep=True).sum() / 2**20) if engine.df is not None else 0.0,
+        "rss_mb": {k: after[k] - before.get(k, 0.0) for k in after},
+        "recommend_ms": ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1,10")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--child", nargs=3, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        mode, csv_path, cache_dir = args.child
+        print(json.dumps(run_child(mode, csv_path, cache_dir, args.queries, args.seed)))
+        return
+
+    from src.embedding import HashingEncoder
+    from src.engine import RecommenderEngine
+
+    env = dict(os.environ, NLTK_OFFLINE="1")
+    report = {}
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, f"reviews_x{scale}.csv")
+            n_reviews = make_corpus(scale, csv_path, args.seed)
+            cache_dir = os.path.join(tmp, "artifacts")
+            # Artifact + katalog dibangun sekali; proses anak hanya memuat
+            RecommenderEngine.build(
+                csv_path=csv_path, cache_dir=cache_dir, encoder=HashingEncoder(), catalogue=True
+            )
+
+            rows = {}
+            for mode in ("df", "catalog"):
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", mode, csv_path, cache_dir,
+                     "--queries", str(args.queries), "--seed", str(args.seed)],
+                    cwd=BASE_DIR, env=env, capture_output=True, text=True
+                )
+                if out.returncode != 0:
+                    print(out.stderr, file=sys.stderr)
+                    raise SystemExit(f"benchmark {mode} skala {scale}x gagal")
+                rows[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+
+        report[scale] = dict(reviews=n_reviews, **rows)
+        print(f"\n=== {scale}x: {n_reviews} review, {rows['df']['shops']} toko ===")
+        for mode, r in rows.items():
+            rss = r["rss_mb"]
+            print(f"  {mode:<8} load {r['load_s']:6.2f} s  df {r['df_mb']:8.2f} MiB  "
+                  f"RSS +{rss.get('VmRSS', 0):7.1f} MiB (anon +{rss.get('RssAnon', 0):7.1f}, "
+                  f"file +{rss.get('RssFile', 0):6.1f})  recommend p50 {r['recommend_ms']['p50']:6.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
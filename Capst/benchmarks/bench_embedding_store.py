@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.vector_index import ExactIndex, normalize_rows
+from src.embedding_store import EmbeddingStore, ranking_agreement
+from bench_vector_index import synthetic_embeddings, make_queries
+
+# =========================
+# FLOAT32 vs FLOAT16 vs INT8
+# =========================
+# Ukuran file, waktu load (mmap), latency scoring per query, dan kesesuaian
+# ranking terhadap float32. --embeddings bisa diisi artifacts/<key>/embeddings.npy
+# Kolom "x f32" = latency relatif terhadap float32: float16 menghemat memori
+# tapi konversi per blok membuatnya jauh lebih lambat dari float32 dan int8.
+#   python benchmarks/bench_embedding_store.py --n 100000
+
+
+def per_query_ms(index, queries):
+    start = time.perf_counter()
+    for q in queries:
+        index.score_all(q[None, :])
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embeddings", default=None)
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = normalize_rows(np.load(args.embeddings))
+    else:
+        vectors = synthetic_embeddings(args.n, args.dim, max(8, args.n // 500), args.seed)
+    queries = make_queries(vectors, min(args.queries, len(vectors)), args.seed)
+
+    exact = ExactIndex(vectors, normalized=True)
+    exact_scores = exact.score_all(queries)
+    report = {
+        "n": len(vectors),
+        "dim": vectors.shape[1],
+        "float32": {"bytes": int(vectors.nbytes), "ms_per_query": per_query_ms(exact, queries)},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in ("float16", "int8"):
+            path = EmbeddingStore.from_vectors(vectors, dtype).save(os.path.join(tmp, dtype))
+            start = time.perf_counter()
+            store = EmbeddingStore.load(path, mmap=True)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            report[dtype] = dict(
+                bytes=int(store.nbytes),
+                load_ms=load_ms,
+                ms_per_query=per_query_ms(store, queries),
+                **ranking_agreement(exact_scores, store.score_all(queries), args.k)
+            )
+            del store
+
+    print(f"n={report['n']} dim={report['dim']} k={args.k}")
+    base = report["float32"]
+    for name in ("float32", "float16", "int8"):
+        r = report[name]
+        r["memory_vs_float32"] = r["bytes"] / base["bytes"]
+        r["latency_vs_float32"] = r["ms_per_query"] / base["ms_per_query"]
+        line = (f"{name:<8} {r['bytes'] / 2**20:8.1f} MiB ({r['memory_vs_float32']:.2f}x)"
+                f"  {r['ms_per_query']:7.2f} ms/query ({r['latency_vs_float32']:.1f}x f32)")
+        if name != "float32":
+            line += (f"  overlap@{args.k}={r[f'overlap@{args.k}']:.3f}"
+                     f"  top1={r['top1_agreement']:.3f}  max_err={r['max_abs_error']:.4f}")
+        print(line)
+    print("catatan: float16 = memori 0.5x tapi latency paling tinggi; "
+          "int8 = pilihan ringkas yang disarankan")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
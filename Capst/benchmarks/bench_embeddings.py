@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.recommender import CSV_PATH
+from src.data_loader import load_reviews
+from src.text_preprocessing import preprocess_batch
+from src.embedding import embed_shops, encoder_name
+from src.vector_index import ExactIndex, ChunkIndex
+from run_benchmarks import load_encoder
+
+# =========================
+# CONCAT vs CHUNK EMBEDDING
+# =========================
+# Satu review per toko (yang punya >= 2 review) disisihkan sebagai query;
+# sisa review dipakai untuk membangun embedding toko. Kualitas = seberapa
+# sering toko asal muncul di top-k (recall@k, MRR).
+#   python benchmarks/bench_embeddings.py
+#   python benchmarks/bench_embeddings.py --encoder hashing
+
+
+def split_held_out(df, seed):
+    rng = np.random.default_rng(seed)
+    shops, queries, targets = [], [], []
+    for i, (_, group) in enumerate(df.groupby("name", sort=True)):
+        parts = group["clean_review"].tolist()
+        if len(parts) >= 2:
+            j = int(rng.integers(len(parts)))
+            queries.append(parts.pop(j))
+            targets.append(i)
+        shops.append(parts)
+    return shops, queries, np.array(targets)
+
+
+def retrieval(index, query_emb, targets, k):
+    scores = index.score_all(query_emb)
+    target_scores = scores[np.arange(len(targets)), targets]
+    # rank = jumlah toko dengan skor lebih tinggi dari toko asal
+    rank = (scores > target_scores[:, None]).sum(axis=1)
+    return {
+        f"recall@{k}": float((rank < k).mean()),
+        "mrr": float((1.0 / (rank + 1)).mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--encoder", choices=["sbert", "hashing"], default="sbert")
+    parser.add_argument("--chunk-tokens", type=int, default=None,
+                        help="default: max_seq_length encoder")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    df = load_reviews(args.csv)
+    df["clean_review"] = preprocess_batch(df["review_text"].tolist())
+    shops, queries, targets = split_held_out(df, args.seed)
+    encoder = load_encoder(args.encoder)
+
+    start = time.perf_counter()
+    concat_emb = encoder.encode([" ".join(p) for p in shops], show_progress_bar=False)
+    concat_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled, chunk_emb, offsets = embed_shops(shops, encoder, max_tokens=args.chunk_tokens)
+    chunk_s = time.perf_counter() - start
+
+    query_emb = encoder.encode(queries, show_progress_bar=False)
+    n_reviews = sum(len(p) for p in shops)
+
+    report = {
+        "encoder": encoder_name(encoder),
+        "shops": len(shops),
+        "reviews": n_reviews,
+        "queries": len(queries),
+        "chunks": int(offsets[-1]),
+        "concat": dict(
+            seconds=concat_s, docs_per_s=n_reviews / concat_s,
+            **retrieval(ExactIndex(concat_emb), query_emb, targets, args.k)
+        ),
+        "chunk_mean": dict(
+            seconds=chunk_s, docs_per_s=n_reviews / chunk_s,
+            **retrieval(ExactIndex(pooled), query_emb, targets, args.k)
+        ),
+        "chunk_maxsim": retrieval(
+            ChunkIndex(pooled, chunk_emb, offsets), query_emb, targets, args.k
+        ),
+    }
+
+    print(f"encoder: {report['encoder']}  toko: {len(shops)}  query: {len(queries)}  chunk: {report['chunks']}")
+    for name in ("concat", "chunk_mean", "chunk_maxsim"):
+        r = report[name]
+        speed = f"{r['docs_per_s']:10.0f} review/s" if "docs_per_s" in r else " " * 19
+        print(f"{name:<14} {speed}  recall@{args.k}={r[f'recall@{args.k}']:.3f}  mrr={r['mrr']:.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
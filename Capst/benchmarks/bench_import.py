@@ -0,0 +1,98 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+# =========================
+# IMPORT-TIME BENCHMARK
+# =========================
+# Setiap pengukuran dijalankan di proses Python baru supaya cache modul
+# tidak ikut terbawa. Jalankan dari folder Capst:
+#   python benchmarks/bench_import.py --repeat 5
+# "baseline" mengulang import eager versi awal (sklearn, sentence_transformers,
+# NLTK, stemmer + stopword dibuat saat import; tanpa nltk.download) sebagai
+# pembanding import modul sekarang.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPETS = {
+    # Biaya import saja (yang dibayar setiap worker / rerun streamlit)
+    "import text_preprocessing": (
+        "import time; t = time.perf_counter();"
+        "import src.text_preprocessing;"
+        "print(time.perf_counter() - t)"
+    ),
+    "import recommender": (
+        "import time; t = time.perf_counter();"
+        "import src.recommender;"
+        "print(time.perf_counter() - t)"
+    ),
+    "baseline import recommender": (
+        "import time; t = time.perf_counter();"
+        "import importlib.util, pandas, numpy;"
+        "import sklearn.feature_extraction.text, sklearn.metrics.pairwise;"
+        "importlib.util.find_spec('sentence_transformers') and __import__('sentence_transformers');"
+        "import langdetect; from nltk.tokenize import word_tokenize; from nltk.corpus import stopwords;"
+        "from Sastrawi.Stemmer.StemmerFactory import StemmerFactory;"
+        "StemmerFactory().create_stemmer();"
+        "set(stopwords.words('indonesian')) | set(stopwords.words('english'));"
+        "print(time.perf_counter() - t)"
+    ),
+    # Biaya yang dipindah ke pemakaian pertama (stemmer + stopword)
+    "first preprocess()": (
+        "import src.text_preprocessing as tp;"
+        "import time; t = time.perf_counter();"
+        "tp.preprocess('tempatnya nyaman dan wifi kencang');"
+        "print(time.perf_counter() - t)"
+    ),
+}
+
+
+def run_snippet(code, env):
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def print_comparison(results):
+    base = results["baseline import recommender"]["median_s"]
+    now = results["import recommender"]["median_s"]
+    results["import recommender"]["speedup_vs_baseline"] = base / now
+    print(f"import recommender: {now * 1000:.1f} ms vs baseline {base * 1000:.1f} ms"
+          f" ({base / now:.1f}x lebih cepat)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ, NLTK_OFFLINE="1")
+    results = {}
+
+    for name, code in SNIPPETS.items():
+        times = [run_snippet(code, env) for _ in range(args.repeat)]
+        results[name] = {
+            "median_s": statistics.median(times),
+            "min_s": min(times),
+            "max_s": max(times),
+        }
+        print(f"{name:<28} median {results[name]['median_s'] * 1000:9.1f} ms")
+
+    print_comparison(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
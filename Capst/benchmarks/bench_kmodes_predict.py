@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.kmodes_predictor import KModesPredictor, MODELS_DIR
+
+# =========================
+# KModes.predict vs KModesPredictor
+# =========================
+# Cek kesamaan label di seluruh kombinasi jawaban kuesioner, lalu ukur
+# latency satu baris (pola streamlit / simulate_system) dan batch.
+#   python benchmarks/bench_kmodes_predict.py
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=100000)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    km = joblib.load(os.path.join(MODELS_DIR, "kmodes_model.pkl"))
+    category_mappings = joblib.load(os.path.join(MODELS_DIR, "category_mappings.pkl"))
+    predictor = KModesPredictor.from_kmodes(km, category_mappings)
+    columns = list(category_mappings)
+
+    # Semua kombinasi jawaban (+ kode tak dikenal) harus sama persis
+    grid = np.array(list(itertools.product(*[
+        list(m) + [len(m)] for m in category_mappings.values()
+    ])))
+    expected = km.predict(grid)
+    got = predictor.predict(grid)
+    mismatches = int((expected != got).sum())
+    print(f"kombinasi: {len(grid)}  mismatch: {mismatches}")
+
+    answers = {col: category_mappings[col][0] for col in columns}
+    row = grid[:1]
+    row_df = pd.DataFrame(row, columns=columns)
+
+    rng = np.random.default_rng(0)
+    batch = grid[rng.integers(0, len(grid), size=args.batch)]
+
+    report = {
+        "combinations": len(grid),
+        "mismatches": mismatches,
+        "single_us": {
+            "kmodes_dataframe": per_call_us(lambda: km.predict(row_df), args.repeat),
+            "kmodes_list": per_call_us(lambda: km.predict(row), args.repeat),
+            "predictor_codes": per_call_us(lambda: predictor.predict(row), args.repeat),
+            "predictor_answers": per_call_us(lambda: predictor.predict_one(answers), args.repeat),
+        },
+    }
+
+    start = time.perf_counter()
+    km.predict(batch)
+    kmodes_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    predictor.predict(batch)
+    predictor_batch = time.perf_counter() - start
+    report["batch"] = {
+        "rows": args.batch,
+        "kmodes_rows_per_s": args.batch / kmodes_batch,
+        "predictor_rows_per_s": args.batch / predictor_batch,
+    }
+
+    for name, us in report["single_us"].items():
+        print(f"{name:<20} {us:10.1f} us/call")
+    for name in ("kmodes_rows_per_s", "predictor_rows_per_s"):
+        print(f"{name:<20} {report['batch'][name]:12.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
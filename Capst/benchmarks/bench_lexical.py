@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.recommender import CSV_PATH, TFIDF_PARAMS
+from src.data_loader import load_reviews
+from src.text_preprocessing import preprocess_batch
+from src.lexical import LexicalScorer
+
+# =========================
+# SKOR TF-IDF PER QUERY
+# =========================
+# cosine_similarity (recommend() lama) vs matriks dok x term (engine lama)
+# vs LexicalScorer (term -> dok). Dokumen sintetis = gabungan review acak,
+# diperbesar sampai --docs; query = 1..8 kata dari review.
+#   python benchmarks/bench_lexical.py --docs 134,1340,13400
+
+
+def synthetic_docs(reviews, n_docs, reviews_per_doc, rng):
+    picks = rng.integers(0, len(reviews), size=(n_docs, reviews_per_doc))
+    return [" ".join(reviews[i] for i in row) for row in picks]
+
+
+def per_query_us(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", default="134,1340,13400")
+    parser.add_argument("--reviews-per-doc", type=int, default=9)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--min-df", type=int, default=2)
+    parser.add_argument("--max-df", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    reviews = [r for r in preprocess_batch(load_reviews(CSV_PATH)["review_text"].tolist()) if r]
+
+    report = {}
+    for n_docs in [int(n) for n in args.docs.split(",")]:
+        docs = synthetic_docs(reviews, n_docs, args.reviews_per_doc, rng)
+        tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+        matrix = tfidf.fit_transform(docs)
+        doc_norm = normalize(matrix.tocsr())
+        scorer = LexicalScorer(tfidf, matrix)
+        pruned = LexicalScorer(tfidf, matrix, min_df=args.min_df, max_df=args.max_df)
+
+        row = {"terms": matrix.shape[1], "nnz": int(matrix.nnz)}
+        for n_words in (1, 3, 8):
+            texts = []
+            for i in rng.integers(0, len(reviews), size=args.queries):
+                words = reviews[i].split()
+                texts.append(" ".join(words[:n_words]))
+            q_raw = [tfidf.transform([t]) for t in texts]
+            q_norm = [normalize(q) for q in q_raw]
+            q_lex = [scorer.transform([t]) for t in texts]
+            q_pruned = [pruned.transform([t]) for t in texts]
+
+            row[f"{n_words}w"] = {
+                "cosine_similarity_us": per_query_us(lambda q: cosine_similarity(q, matrix), q_raw),
+                "doc_term_dot_us": per_query_us(lambda q: (doc_norm @ q.T).toarray(), q_norm),
+                "lexical_sparse_us": per_query_us(scorer.score_sparse, q_lex),
+                "lexical_dense_us": per_query_us(scorer.score, q_lex),
+                "lexical_pruned_us": per_query_us(pruned.score, q_pruned),
+            }
+
+        check = scorer.score(scorer.transform(texts[:20]))
+        row["max_abs_diff"] = float(np.abs(check - cosine_similarity(tfidf.transform(texts[:20]), matrix)).max())
+        row["pruned"] = pruned.stats()
+        report[n_docs] = row
+
+        print(f"\n=== {n_docs} dokumen, {row['terms']} term, nnz {row['nnz']} "
+              f"(pruned: {row['pruned']['terms']} term, nnz {row['pruned']['nnz']}) ===")
+        for n_words in (1, 3, 8):
+            r = row[f"{n_words}w"]
+            print(f"  {n_words} kata: " + "  ".join(f"{k[:-3]}={v:8.1f}us" for k, v in r.items()))
+        print(f"  max |diff| vs cosine_similarity: {row['max_abs_diff']:.2e}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.recommender import CSV_PATH, TFIDF_PARAMS
+from src.data_loader import load_reviews
+from src.text_preprocessing import preprocess_batch
+from src.embedding import HashingEncoder
+from src.engine import RecommenderEngine
+from src.review_index import ReviewIndex
+from run_benchmarks import scale_reviews, percentiles, timed_calls
+
+# =========================
+# PER-TOKO (GABUNGAN) vs PER-REVIEW
+# =========================
+# Review asli di-preprocess sekali lalu diperbanyak (urutan kata diacak,
+# nama toko diberi akhiran) ke skala 10x-100x. Dibandingkan: waktu build,
+# memori index, dan latency recommend() untuk kedua mode.
+#   python benchmarks/bench_review_index.py --scales 10,100
+
+
+def scaled_shops(base, scale, rng):
+    # base: DataFrame review (name, area, address, rating, clean_review)
+    reviews = scale_reviews(base, scale, rng, text_col="clean_review")
+
+    shops = reviews.groupby("name", sort=True).agg(
+        clean_review=("clean_review", " ".join),
+        review_parts=("clean_review", list),
+        rating=("rating", "mean"),
+        area=("area", "first"),
+        address=("address", "first"),
+    ).reset_index()
+    return shops, len(reviews)
+
+
+def index_bytes(engine):
+    lex = engine.lexical.stats()
+    vi = engine.vector_index
+    vectors = vi.index.vectors if hasattr(vi, "index") else vi.vectors
+    return int(vectors.nbytes + lex["bytes"])
+
+
+def latency_ms(engine, queries, areas):
+    out = {}
+    for name, lokasi in (("no_lokasi", [None] * len(queries)), ("lokasi", areas)):
+        out[name] = percentiles(timed_calls(
+            lambda q, a: engine.recommend(q, "Productive Work / Study", a, top_k=5), zip(queries, lokasi)
+        ))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="10,100")
+    parser.add_argument("--agg", choices=["max", "mean", "top_m"], default="max")
+    parser.add_argument("--top-m", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    base = load_reviews(CSV_PATH)
+    base["clean_review"] = preprocess_batch(base["review_text"].tolist())
+    base = base[["name", "area", "address", "rating", "clean_review"]]
+    encoder = HashingEncoder()
+
+    texts = [t for t in base["clean_review"] if t]
+    queries = [" ".join(texts[i].split()[:4]) for i in rng.integers(0, len(texts), size=args.queries)]
+    areas = [base["area"].iloc[i] for i in rng.integers(0, len(base), size=args.queries)]
+
+    report = {}
+    for scale in [int(s) for s in args.scales.split(",")]:
+        shops, n_reviews = scaled_shops(base, scale, rng)
+        row = {"reviews": n_reviews, "shops": len(shops)}
+
+        start = time.perf_counter()
+        tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+        matrix = tfidf.fit_transform(shops["clean_review"])
+        emb = encoder.encode(shops["clean_review"].tolist())
+        shop_engine = RecommenderEngine(shops.drop(columns="review_parts"), tfidf, matrix, encoder, emb)
+        row["shop"] = {"build_s": time.perf_counter() - start, "index_bytes": index_bytes(shop_engine)}
+
+        start = time.perf_counter()
+        reviews = ReviewIndex.build(shops["review_parts"].tolist(), encoder, args.agg, args.top_m)
+        review_engine = RecommenderEngine(
+            shops.drop(columns="review_parts"), tfidf, matrix, encoder, emb,
+            vector_index=reviews.vector_index(), lexical=reviews.lexical_scorer()
+        )
+        row["review"] = {"build_s": time.perf_counter() - start, "index_bytes": index_bytes(review_engine)}
+
+        row["shop"]["ms"] = latency_ms(shop_engine, queries, areas)
+        row["review"]["ms"] = latency_ms(review_engine, queries, areas)
+        report[scale] = row
+
+        print(f"\n=== {scale}x: {n_reviews} review, {len(shops)} toko (agg={args.agg}) ===")
+        for mode in ("shop", "review"):
+            r = row[mode]
+            print(f"  {mode:<7} build {r['build_s']:7.2f} s  index {r['index_bytes'] / 2**20:7.1f} MiB  "
+                  f"p50 {r['ms']['no_lokasi']['p50']:6.2f} ms  p95 {r['ms']['no_lokasi']['p95']:6.2f} ms  "
+                  f"lokasi p50 {r['ms']['lokasi']['p50']:6.2f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
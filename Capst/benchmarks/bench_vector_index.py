@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.vector_index import ExactIndex, IVFIndex, normalize_rows
+
+# =========================
+# RECALL@K vs LATENCY
+# =========================
+# Membandingkan IVFIndex terhadap ExactIndex. Default memakai embedding
+# sintetis berkelompok (mirip katalog multi-kota); --embeddings bisa diisi
+# file .npy dari artifacts/<key>/embeddings.npy. Jalankan dari folder Capst:
+#   python benchmarks/bench_vector_index.py --n 100000 --k 10
+
+
+def synthetic_embeddings(n, dim, n_clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.normal(size=(n_clusters, dim)))
+    labels = rng.integers(0, n_clusters, size=n)
+    noise = rng.normal(scale=0.35, size=(n, dim)).astype(np.float32)
+    return normalize_rows(centers[labels] + noise / np.sqrt(dim) * 4)
+
+
+def make_queries(vectors, n_queries, seed):
+    rng = np.random.default_rng(seed + 1)
+    base = vectors[rng.choice(len(vectors), size=n_queries, replace=False)]
+    noise = rng.normal(scale=0.05, size=base.shape).astype(np.float32)
+    return normalize_rows(base + noise)
+
+
+def timed_search(index, queries, k, **kwargs):
+    # Satu query per panggilan, seperti pola request di serving
+    ids = []
+    start = time.perf_counter()
+    for q in queries:
+        ids.append(index.search(q[None, :], k, **kwargs)[0][0])
+    elapsed = time.perf_counter() - start
+    return np.array(ids), elapsed / len(queries) * 1000
+
+
+def recall_at_k(found, truth):
+    hits = [len(set(f[f >= 0]) & set(t)) for f, t in zip(found, truth)]
+    return float(np.mean(hits)) / truth.shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embeddings", default=None)
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--probes", default="1,2,4,8,16,32")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = normalize_rows(np.load(args.embeddings))
+    else:
+        vectors = synthetic_embeddings(args.n, args.dim, max(8, args.n // 500), args.seed)
+    queries = make_queries(vectors, min(args.queries, len(vectors)), args.seed)
+
+    exact = ExactIndex(vectors, normalized=True)
+    truth, exact_ms = timed_search(exact, queries, args.k)
+
+    start = time.perf_counter()
+    ivf = IVFIndex(vectors, n_lists=args.n_lists, normalized=True, seed=args.seed)
+    build_s = time.perf_counter() - start
+
+    report = {
+        "n": len(vectors),
+        "dim": vectors.shape[1],
+        "k": args.k,
+        "n_lists": ivf.n_lists,
+        "ivf_build_s": build_s,
+        "exact_ms_per_query": exact_ms,
+        "ivf": [],
+    }
+    print(f"n={len(vectors)} dim={vectors.shape[1]} lists={ivf.n_lists} build={build_s:.2f}s")
+    print(f"exact            {exact_ms:8.3f} ms/query  recall@{args.k}=1.000")
+
+    for n_probe in [int(p) for p in args.probes.split(",")]:
+        found, ms = timed_search(ivf, queries, args.k, n_probe=n_probe)
+        recall = recall_at_k(found, truth)
+        report["ivf"].append({"n_probe": n_probe, "ms_per_query": ms, "recall": recall})
+        print(f"ivf n_probe={n_probe:<4} {ms:8.3f} ms/query  recall@{args.k}={recall:.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
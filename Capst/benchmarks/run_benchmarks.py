@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+# =========================
+# END-TO-END BENCHMARK
+# =========================
+# Korpus sintetis = CSV review asli diperbanyak (1x, 10x, 100x). Setiap skala
+# dijalankan di proses Python baru sehingga build "cold" benar-benar dingin
+# dan peak RSS terukur per skala. Default memakai HashingEncoder (offline).
+#   python benchmarks/run_benchmarks.py --scales 1,10 --output bench.json
+#   python benchmarks/run_benchmarks.py --compare bench_lama.json --output bench.json
+
+# Metrik utama yang dibandingkan dengan --compare (True = makin kecil makin baik)
+KEY_METRICS = {
+    "build.cold_s": True,
+    "build.warm_s": True,
+    "preprocess.reviews_per_s": False,
+    "recommend.ms.p50": True,
+    "recommend.ms.p95": True,
+    "recommend_lokasi.ms.p50": True,
+    "recommend_lokasi.ms.p95": True,
+    "batch.queries_per_s": False,
+    "kmodes.us.p50": True,
+    "peak_rss_mb": True,
+}
+
+
+# =========================
+# KORPUS SINTETIS
+# =========================
+def scale_reviews(base, scale, rng, text_col="review_text"):
+    # Salinan ke-i setiap toko diberi nama "<nama> #i" dan urutan kata
+    # review diacak agar tidak menjadi duplikat persis (preprocess_batch
+    # men-dedupe teks identik)
+    copies = []
+    for i in range(scale):
+        df = base.copy()
+        if i:
+            df["name"] = df["name"].astype(str) + f" #{i}"
+            df[text_col] = [
+                " ".join(rng.permutation(str(t).split())) for t in df[text_col]
+            ]
+        copies.append(df)
+    return pd.concat(copies, ignore_index=True)
+
+
+def make_corpus(scale, out_path, seed=42):
+    from src.recommender import CSV_PATH
+    from src.data_loader import load_reviews, REVIEW_COLUMNS, CSV_OPTIONS
+
+    base = load_reviews(CSV_PATH)
+    corpus = scale_reviews(base, scale, np.random.default_rng(seed))[REVIEW_COLUMNS]
+    corpus.to_csv(out_path, index=False, **CSV_OPTIONS)
+    return len(corpus)
+
+
+def percentiles(values, unit=1000.0):
+    values = np.asarray(values) * unit
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean()),
+    }
+
+
+def timed_calls(fn, args_list):
+    times = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def load_encoder(kind):
+    from src.embedding import HashingEncoder
+
+    if kind == "sbert":
+        try:
+            from src.recommender import load_sbert
+            return load_sbert()
+        except ImportError:
+            print("sentence-transformers tidak tersedia, pakai HashingEncoder")
+    return HashingEncoder()
+
+
+# =========================
+# SATU SKALA (PROSES ANAK)
+# =========================
+def run_scale(scale, args):
+    from src.text_preprocessing import preprocess_batch, clear_caches, load_resources
+    from src.recommender import build_artifacts
+    from src.data_loader import load_reviews
+    from src.engine import RecommenderEngine
+    from src.kmodes_predictor import KModesPredictor
+
+    report = {"scale": scale}
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, f"reviews_x{scale}.csv")
+        start = time.perf_counter()
+        report["reviews"] = make_corpus(scale, csv_path, args.seed)
+        report["corpus_s"] = time.perf_counter() - start
+
+        # ---------- preprocessing ----------
+        texts = load_reviews(csv_path)["review_text"].tolist()
+        load_resources()
+        clear_caches()
+        start = time.perf_counter()
+        preprocess_batch(texts)
+        elapsed = time.perf_counter() - start
+        report["preprocess"] = {"seconds": elapsed, "reviews_per_s": len(texts) / elapsed}
+
+        # ---------- build ----------
+        encoder = load_encoder(args.encoder)
+        cache_dir = os.path.join(tmp, "artifacts")
+        build_kwargs = dict(
+            csv_path=csv_path, cache_dir=cache_dir, encoder=encoder, n_workers=args.workers
+        )
+        clear_caches()
+        start = time.perf_counter()
+        build_artifacts(**build_kwargs)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        a = build_artifacts(**build_kwargs)
+        warm = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = RecommenderEngine(
+            a["df"], a["tfidf"], a["tfidf_matrix"], a["sbert"], a["embeddings"]
+        )
+        engine_s = time.perf_counter() - start
+        report["build"] = {"cold_s": cold, "warm_s": warm, "engine_s": engine_s, "shops": len(engine)}
+
+        # ---------- query ----------
+        # Query = potongan 3-8 kata dari review asli, segment & area acak
+        picks = rng.choice(len(texts), size=args.queries, replace=len(texts) < args.queries)
+        queries = []
+        for i in picks:
+            words = str(texts[i]).split()
+            n = int(rng.integers(3, 9))
+            queries.append(" ".join(words[:n]) or "kopi")
+        segments = [engine.segments[j] for j in rng.integers(0, len(engine.segments), size=args.queries)]
+        areas = [engine.area_index.keys[j] for j in rng.integers(0, len(engine.area_index.keys), size=args.queries)]
+
+        report["recommend"] = {"ms": percentiles(timed_calls(
+            lambda q, s: engine.recommend(q, s, top_k=5), zip(queries, segments)
+        ))}
+        report["recommend_lokasi"] = {"ms": percentiles(timed_calls(
+            lambda q, s, a: engine.recommend(q, s, a, top_k=5), zip(queries, segments, areas)
+        ))}
+        report["recommend_empty"] = {"ms": percentiles(timed_calls(
+            lambda s, a: engine.recommend("", s, a, top_k=5), zip(segments, areas)
+        ))}
+
+        engine.query_cache.clear()
+        batch = [(q, s, a) for q, s, a in zip(queries, segments, areas)]
+        start = time.perf_counter()
+        for s in range(0, len(batch), args.batch):
+            engine.recommend_batch(batch[s:s + args.batch])
+        elapsed = time.perf_counter() - start
+        report["batch"] = {"queries": len(batch), "batch_size": args.batch, "queries_per_s": len(batch) / elapsed}
+
+        # ---------- segmentasi ----------
+        predictor = KModesPredictor.load()
+        answers = [
+            {col: cats[int(rng.integers(len(cats)))] for col, cats in zip(predictor.columns, predictor.categories)}
+            for _ in range(args.queries)
+        ]
+        report["kmodes"] = {"us": percentiles(
+            timed_calls(predictor.predict_one, [(a,) for a in answers]), unit=1e6
+        )}
+
+    # ru_maxrss dalam KiB di Linux, byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    report["peak_rss_mb"] = rss / (2**20 if sys.platform == "darwin" else 2**10)
+    return report
+
+
+# =========================
+# ORKESTRASI
+# =========================
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def child_args(args, scale):
+    return [
+        sys.executable, os.path.abspath(__file__), "--child", str(scale),
+        "--encoder", args.encoder, "--queries", str(args.queries),
+        "--batch", str(args.batch), "--workers", str(args.workers),
+        "--seed", str(args.seed),
+    ]
+
+
+def lookup(report, dotted):
+    for part in dotted.split("."):
+        if not isinstance(report, dict) or part not in report:
+            return None
+        report = report[part]
+    return report
+
+
+def compare(old, new):
+    print("\nPerbandingan dengan", old.get("meta", {}).get("commit"))
+    for scale, current in new["scales"].items():
+        previous = old.get("scales", {}).get(scale)
+        if previous is None:
+            continue
+        print(f"  skala {scale}x")
+        for metric, lower_better in KEY_METRICS.items():
+            a, b = lookup(previous, metric), lookup(current, metric)
+            if not a or b is None:
+                continue
+            change = (b - a) / a * 100
+            worse = change > 0 if lower_better else change < 0
+            flag = "  <-- regresi" if worse and abs(change) > 10 else ""
+            print(f"    {metric:<26} {a:12.3f} -> {b:12.3f} ({change:+6.1f}%){flag}")
+
+
+def print_report(report):
+    print(f"\n=== skala {report['scale']}x: {report['reviews']} review, {report['build']['shops']} toko ===")
+    print(f"  build cold / warm    {report['build']['cold_s']:8.2f} s / {report['build']['warm_s']:.3f} s")
+    print(f"  preprocess           {report['preprocess']['reviews_per_s']:8.0f} review/s")
+    for name in ("recommend", "recommend_lokasi", "recommend_empty"):
+        ms = report[name]["ms"]
+        print(f"  {name:<20} p50 {ms['p50']:7.2f}  p95 {ms['p95']:7.2f}  p99 {ms['p99']:7.2f} ms")
+    print(f"  recommend_batch      {report['batch']['queries_per_s']:8.0f} query/s")
+    print(f"  kmodes predict_one   p50 {report['kmodes']['us']['p50']:7.1f} us")
+    print(f"  peak RSS             {report['peak_rss_mb']:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1,10,100")
+    parser.add_argument("--encoder", choices=["hashing", "sbert"], default="hashing")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_scale(args.child, args)))
+        return
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("child", "output", "compare")},
+        },
+        "scales": {},
+    }
+
+    env = dict(os.environ, NLTK_OFFLINE="1")
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        out = subprocess.run(
+            child_args(args, scale), cwd=BASE_DIR, env=env,
+            capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            print(out.stderr, file=sys.stderr)
+            raise SystemExit(f"benchmark skala {scale}x gagal")
+        report = json.loads(out.stdout.strip().splitlines()[-1])
+        results["scales"][str(scale)] = report
+        print_report(report)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
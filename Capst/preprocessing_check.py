@@ -1,18 +1,15 @@
-import pandas as pd
-from src.text_preprocessing import preprocess
+from src.text_preprocessing import preprocess_batch
+from src.data_loader import load_reviews, new_stats
 
-df = pd.read_csv(
+stats = new_stats()
+df = load_reviews(
     "Dataset/Coffeeshop/coffee_shop_yogyakarta_reviews.csv",
-    sep=';',
-    quotechar='"',
-    on_bad_lines='skip',
-    engine='python'
+    columns=['name', 'review_text'],
+    stats=stats
 )
+print(stats)
 
-df.columns = df.columns.str.strip()
-df = df.dropna(subset=['review_text','name'])
-
-df['clean_review'] = df['review_text'].apply(preprocess)
+df['clean_review'] = preprocess_batch(df['review_text'].tolist())
 
 print(df[['name', 'review_text', 'clean_review']].sample(5))
 
@@ -1,20 +1,19 @@
-import pandas as pd
-from text_preprocessing import preprocess
+from text_preprocessing import preprocess_batch
+from data_loader import iter_review_chunks
 
-# Load data
-df = pd.read_csv(
+# Load data (cukup blok pertama untuk contoh)
+chunks = iter_review_chunks(
     "Dataset/Coffeeshop/coffee_shop_yogyakarta_reviews.csv",
-    sep=';',
-    quotechar='"',
-    on_bad_lines='skip',
-    engine='python'
+    chunk_lines=100,
+    columns=['review_text'],
+    required=('review_text',)
 )
 
 # Ambil beberapa contoh
-sample = df[['review_text']].dropna().head(5)
+sample = next(chunks)[['review_text']].head(5)
 
 # Preprocessing
-sample['hasil_preprocessing'] = sample['review_text'].apply(preprocess)
+sample['hasil_preprocessing'] = preprocess_batch(sample['review_text'].tolist())
 
 # Simpan ke CSV untuk dokumentasi laporan
 sample.to_csv("hasil_preprocessing_contoh.csv", index=False)
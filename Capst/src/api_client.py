@@ -0,0 +1,52 @@
+import json
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+# Kolom hasil yang dikirim API (clean_review tidak ikut dikirim)
+RESULT_COLUMNS = ["name", "area", "address", "rating", "score"]
+
+
+# =========================
+# CLIENT RECOMMENDER API
+# =========================
+class RecommenderClient:
+    # Pengganti RecommenderEngine di sisi UI: recommend() punya signature
+    # yang sama tetapi dijalankan oleh proses src/serving.py, jadi worker UI
+    # tidak perlu memuat SentenceTransformer / artifact sendiri
+
+    def __init__(self, base_url, timeout=10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        req = urllib.request.Request(
+            self.base_url + path, data=data,
+            headers={"Content-Type": "application/json"},
+            method="GET" if data is None else "POST"
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as exc:
+            detail = exc.read().decode("utf-8", "replace")
+            raise RuntimeError(f"API {path} gagal ({exc.code}): {detail}") from exc
+
+    def health(self):
+        return self._request("/health")
+
+    def segment(self, answers):
+        return self._request("/segment", {"answers": answers})
+
+    def recommend(self, user_text="", segment=None, lokasi=None,
+                  alpha=0.35, beta=0.25, gamma=0.20, delta=0.20, top_k=5):
+        resp = self._request("/recommend", {
+            "user_text": user_text,
+            "segment": segment,
+            "lokasi": lokasi,
+            "weights": [alpha, beta, gamma, delta],
+            "top_k": top_k,
+        })
+        return pd.DataFrame(resp["results"], columns=RESULT_COLUMNS)
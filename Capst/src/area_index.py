@@ -0,0 +1,61 @@
+from functools import lru_cache
+import numpy as np
+
+
+def normalize_area(text):
+    return " ".join(str(text).lower().split())
+
+
+# =========================
+# AREA INDEX
+# =========================
+class AreaIndex:
+    # area ternormalisasi -> array row id (terurut). Pencarian lokasi
+    # hanya memindai daftar area unik, bukan seluruh baris dokumen.
+
+    def __init__(self, areas):
+        # Area kosong (None / NaN) -> key "" (hanya ikut pada query tanpa lokasi)
+        norm = np.array(
+            [normalize_area(a) if a is not None and a == a else "" for a in areas], dtype=object
+        )
+        keys, codes = np.unique(norm, return_inverse=True)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+
+        self.n_rows = len(norm)
+        self.keys = [str(k) for k in keys]
+        self.row_ids = {
+            key: order[bounds[i]:bounds[i + 1]]
+            for i, key in enumerate(self.keys)
+        }
+        for ids in self.row_ids.values():
+            ids.setflags(write=False)
+
+        # Hasil lookup dipakai bersama antar request -> read-only
+        self.lookup = lru_cache(maxsize=1024)(self._lookup)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def match_keys(self, lokasi, mode="substring"):
+        needle = normalize_area(lokasi)
+        if mode == "prefix":
+            return [
+                k for k in self.keys
+                if k.startswith(needle) or any(t.startswith(needle) for t in k.split())
+            ]
+        return [k for k in self.keys if needle in k]
+
+    def _lookup(self, lokasi, mode="substring"):
+        # None -> tanpa filter (semua baris)
+        if not lokasi or not normalize_area(lokasi):
+            return None
+
+        keys = self.match_keys(lokasi, mode)
+        if not keys:
+            return np.empty(0, dtype=np.intp)
+        if len(keys) == 1:
+            return self.row_ids[keys[0]]
+        ids = np.sort(np.concatenate([self.row_ids[k] for k in keys]))
+        ids.setflags(write=False)
+        return ids
@@ -0,0 +1,162 @@
+import os
+import json
+import shutil
+import uuid
+import pickle
+import hashlib
+import joblib
+from importlib.metadata import version
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# =========================
+# PATH & VERSI ARTIFACT
+# =========================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.path.join(BASE_DIR, "artifacts")
+
+# Naikkan angka ini jika format file di bawah berubah
+ARTIFACT_VERSION = 2
+
+DF_FILE = "df_agg.pkl"
+TFIDF_FILE = "tfidf.pkl"
+MATRIX_FILE = "tfidf_matrix.npz"
+EMBEDDINGS_FILE = "embeddings.npy"
+META_FILE = "meta.json"
+
+
+# =========================
+# CACHE KEY
+# =========================
+def hash_file(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def artifact_key(csv_path, preprocess_config, model_name, extra=None):
+    payload = {
+        "artifact_version": ARTIFACT_VERSION,
+        "csv_sha256": hash_file(csv_path),
+        "preprocess": preprocess_config,
+        "model": model_name,
+        "extra": extra or {},
+        # Pickle (df_agg, TfidfVectorizer) tidak dijamin terbaca lintas versi
+        "libraries": {
+            # Versi dibaca dari metadata: import sklearn sendiri ~1.5 s
+            "sklearn": version("scikit-learn"),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+        },
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:20]
+
+
+def artifact_path(key, cache_dir=ARTIFACT_DIR):
+    return os.path.join(cache_dir, key)
+
+
+# =========================
+# SAVE / LOAD
+# =========================
+def _remove(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def replace_atomic(path, write, overwrite=False):
+    # write(tmp) menulis file / folder sementara di samping path, lalu
+    # di-rename ke path supaya worker lain tidak pernah membaca hasil yang
+    # setengah jadi. tmp selalu dihapus, termasuk saat write() gagal.
+    # overwrite=True: folder lama (beserta file turunan di dalamnya)
+    # digeser ke samping, diganti yang baru, lalu dihapus.
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    try:
+        write(tmp)
+        if overwrite and os.path.isdir(path):
+            old = f"{tmp}.old"
+            os.replace(path, old)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                os.replace(old, path)
+                raise
+            _remove(old)
+            return path
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Folder tujuan sudah ada: worker lain lebih dulu menulis
+            # isi yang sama
+            if not os.path.exists(path):
+                raise
+    finally:
+        _remove(tmp)
+    return path
+
+
+def save_artifacts(path, df_agg, tfidf, tfidf_matrix, embeddings, meta=None,
+                   extras=None, overwrite=False):
+    # overwrite=False: key yang sama berarti isi yang sama, folder yang
+    # sudah ada dipakai apa adanya. overwrite=True untuk artifact yang
+    # isinya berubah (IncrementalRecommender.save): katalog, segment_match,
+    # store_* dan reviews/ lama ikut terhapus sehingga dibangun ulang saat
+    # dibuka, bukan melayani data basi.
+    def write(tmp):
+        os.makedirs(tmp)
+        joblib.dump(df_agg, os.path.join(tmp, DF_FILE))
+        joblib.dump(tfidf, os.path.join(tmp, TFIDF_FILE))
+        sp.save_npz(os.path.join(tmp, MATRIX_FILE), sp.csr_matrix(tfidf_matrix))
+        np.save(os.path.join(tmp, EMBEDDINGS_FILE), np.asarray(embeddings))
+        # Array tambahan opsional (mis. chunk_embeddings) -> <nama>.npy
+        for name, array in (extras or {}).items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(array))
+
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(dict(meta or {}, artifact_version=ARTIFACT_VERSION), f, indent=2)
+
+    return replace_atomic(path, write, overwrite)
+
+
+def load_artifacts(path, mmap=True, load_df=True):
+    # load_df=False: df_agg (berisi clean_review) tidak dibaca -> None;
+    # metadata toko untuk serving diambil dari katalog (src/catalogue.py)
+    if not os.path.exists(os.path.join(path, META_FILE)):
+        return None
+
+    try:
+        df_agg = joblib.load(os.path.join(path, DF_FILE)) if load_df else None
+        tfidf = joblib.load(os.path.join(path, TFIDF_FILE))
+        tfidf_matrix = sp.load_npz(os.path.join(path, MATRIX_FILE)).tocsr()
+        embeddings = np.load(
+            os.path.join(path, EMBEDDINGS_FILE),
+            mmap_mode="r" if mmap else None
+        )
+    except (OSError, ValueError, EOFError, AttributeError, ModuleNotFoundError,
+            pickle.UnpicklingError):
+        # Artifact rusak / pickle dari versi library lain -> perlakukan
+        # sebagai cache miss
+        return None
+
+    return df_agg, tfidf, tfidf_matrix, embeddings
+
+
+def load_extras(path, names, mmap=True):
+    out = {}
+    for name in names:
+        file = os.path.join(path, f"{name}.npy")
+        out[name] = np.load(file, mmap_mode="r" if mmap else None) if os.path.exists(file) else None
+    return out
+
+
+def clear_artifacts(cache_dir=ARTIFACT_DIR):
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
@@ -0,0 +1,146 @@
+import os
+import json
+import hashlib
+import joblib
+import numpy as np
+import pyarrow as pa
+
+try:
+    from src import artifact_store, keyword_matcher
+    from src.keyword_matcher import KeywordMatcher
+except ModuleNotFoundError:
+    import artifact_store
+    import keyword_matcher
+    from keyword_matcher import KeywordMatcher
+
+CATALOGUE_FILE = "catalogue.arrow"
+KEYWORD_INDEX_DIR = "keywords"
+CATALOGUE_COLUMNS = ["name", "area", "address", "rating"]
+
+
+# =========================
+# TULIS KATALOG
+# =========================
+def catalogue_table(df):
+    # Hanya kolom untuk ranking + tampilan: area di-dictionary-encode
+    # (kode int kecil + daftar area unik), rating float32. clean_review
+    # tidak ikut. Area / alamat kosong (NaN) disimpan sebagai null.
+    return pa.table({
+        "name": pa.array(df["name"], pa.string(), from_pandas=True),
+        "area": pa.array(df["area"], pa.string(), from_pandas=True).dictionary_encode(),
+        "address": pa.array(df["address"], pa.string(), from_pandas=True),
+        "rating": pa.array(df["rating"].to_numpy(dtype=np.float32), pa.float32()),
+    })
+
+
+def write_catalogue(path, df):
+    # Arrow IPC file tanpa kompresi supaya bisa dibaca langsung lewat mmap
+    table = catalogue_table(df)
+
+    def write(tmp):
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return artifact_store.replace_atomic(path, write)
+
+
+# =========================
+# KATALOG (MMAP)
+# =========================
+class Catalogue:
+    # Metadata toko dari file Arrow yang di-mmap: buffer dibagi oleh semua
+    # worker di page cache OS, bukan disalin ke heap tiap proses
+
+    def __init__(self, table):
+        self.table = table.combine_chunks()
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        source = pa.memory_map(path, "r") if mmap else pa.OSFile(path, "rb")
+        return cls(pa.ipc.open_file(source).read_all())
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def rating(self):
+        return self.table.column("rating").chunk(0).to_numpy(zero_copy_only=True)
+
+    @property
+    def area_codes(self):
+        # Kode area per toko; -1 untuk area kosong (null)
+        indices = self.table.column("area").chunk(0).indices
+        if indices.null_count:
+            return indices.fill_null(-1).to_numpy()
+        return indices.to_numpy(zero_copy_only=True)
+
+    @property
+    def area_names(self):
+        return self.table.column("area").chunk(0).dictionary.to_pylist()
+
+    @property
+    def areas(self):
+        # Area per toko (object array berisi referensi ke area_names, None
+        # untuk area kosong) untuk AreaIndex
+        names = np.array(self.area_names + [None], dtype=object)
+        return names[self.area_codes]
+
+    @property
+    def names(self):
+        return self.table.column("name").to_pylist()
+
+    def frame(self, rows=None):
+        # DataFrame untuk tampilan; area -> Categorical. Engine hanya
+        # mengonversi baris hasil (top-k), index = nomor baris seperti iloc
+        if rows is None:
+            return self.table.to_pandas()
+        rows = np.asarray(rows, dtype=np.int64)
+        frame = self.table.take(rows).to_pandas()
+        frame.index = rows
+        return frame
+
+    def nbytes(self):
+        return int(self.table.nbytes)
+
+
+# =========================
+# KATALOG + SEGMENT MATCH DI FOLDER ARTIFACT
+# =========================
+def segment_file(segment_keywords):
+    # Skor segment bergantung pada keyword, bukan pada key artifact: nama
+    # file memuat hash keyword sehingga perubahan keyword tidak memakai
+    # file lama
+    blob = json.dumps(segment_keywords, ensure_ascii=False).encode("utf-8")
+    return f"segment_match_{hashlib.sha256(blob).hexdigest()[:12]}.npy"
+
+
+def open_catalogue(artifact_dir, segment_keywords, df=None, mmap=True):
+    # (Catalogue, segment_match) untuk serving. df_agg (dengan clean_review)
+    # hanya dibaca sekali bila katalog / segment_match / posting keyword
+    # belum ada di folder artifact (mis. artifact lama)
+    cat_path = os.path.join(artifact_dir, CATALOGUE_FILE)
+    seg_path = os.path.join(artifact_dir, segment_file(segment_keywords))
+    kw_path = os.path.join(artifact_dir, KEYWORD_INDEX_DIR)
+    kw_ready = os.path.exists(os.path.join(kw_path, keyword_matcher.META_FILE))
+
+    if not (os.path.exists(cat_path) and os.path.exists(seg_path) and kw_ready):
+        if df is None:
+            df = joblib.load(os.path.join(artifact_dir, artifact_store.DF_FILE))
+        if not os.path.exists(cat_path):
+            write_catalogue(cat_path, df)
+        if not (os.path.exists(seg_path) and kw_ready):
+            matcher = KeywordMatcher(df["clean_review"], segment_keywords)
+            if not kw_ready:
+                # Posting n-gram untuk engine.add_segment() tanpa teks review
+                artifact_store.replace_atomic(kw_path, matcher.save)
+            if not os.path.exists(seg_path):
+                matrix = matcher.segment_matrix()
+
+                def write(tmp):
+                    with open(tmp, "wb") as f:
+                        np.save(f, matrix)
+
+                artifact_store.replace_atomic(seg_path, write)
+
+    segment_match = np.load(seg_path, mmap_mode="r" if mmap else None)
+    return Catalogue.load(cat_path, mmap), segment_match
@@ -0,0 +1,166 @@
+import io
+import warnings
+import pandas as pd
+from pandas.errors import ParserError, ParserWarning
+
+# =========================
+# KONFIGURASI CSV REVIEW
+# =========================
+REVIEW_COLUMNS = ["area", "name", "rating", "address", "review_text"]
+CSV_OPTIONS = {"sep": ";", "quotechar": '"'}
+DEFAULT_CHUNK_LINES = 50_000
+
+
+def new_stats():
+    return {
+        "rows": 0,
+        "skipped_lines": 0,
+        "dropped_rows": 0,
+        "chunks": 0,
+        "fallback_chunks": 0,
+    }
+
+
+# =========================
+# BLOK BARIS MENTAH
+# =========================
+def iter_line_blocks(csv_path, chunk_lines=DEFAULT_CHUNK_LINES):
+    # Baca header + blok berisi +-chunk_lines baris fisik. Blok hanya
+    # dipotong di batas record: jumlah tanda kutip di dalam blok harus
+    # genap, jadi field ber-quote yang memuat newline tidak terbelah.
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        header = f.readline()
+        block, quotes = [], 0
+        for line in f:
+            block.append(line)
+            quotes += line.count('"')
+            if len(block) >= chunk_lines and quotes % 2 == 0:
+                yield header, "".join(block)
+                block, quotes = [], 0
+        if block:
+            yield header, "".join(block)
+
+
+def _select(df, columns):
+    # Semua field tetap di-tokenize (tanpa usecols) agar baris dengan jumlah
+    # field salah tetap terdeteksi & dilewati; kolom lain langsung dibuang
+    # sehingga memori hanya sebesar satu blok
+    df.columns = df.columns.str.strip()
+    return df[[c for c in columns if c in df.columns]]
+
+
+def _parse_c(header, block, columns):
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ParserWarning)
+        df = pd.read_csv(
+            io.StringIO(header + block),
+            on_bad_lines="warn",
+            engine="c",
+            **CSV_OPTIONS
+        )
+    skipped = sum(str(w.message).count("Skipping line") for w in caught)
+    return _select(df, columns), skipped
+
+
+def _parse_python(header, block, columns):
+    skipped = [0]
+
+    def on_bad_line(fields):
+        skipped[0] += 1
+        return None
+
+    df = pd.read_csv(
+        io.StringIO(header + block),
+        on_bad_lines=on_bad_line,
+        engine="python",
+        **CSV_OPTIONS
+    )
+    return _select(df, columns), skipped[0]
+
+
+# =========================
+# STREAMING LOADER
+# =========================
+def iter_review_chunks(csv_path, chunk_lines=DEFAULT_CHUNK_LINES,
+                       columns=REVIEW_COLUMNS, required=("review_text", "name"),
+                       stats=None):
+    # Generator DataFrame per blok, hanya kolom yang dibutuhkan. Parser C
+    # dipakai lebih dulu; blok yang gagal di-parse ulang dengan parser python.
+    stats = new_stats() if stats is None else stats
+    columns = list(columns)
+
+    for header, block in iter_line_blocks(csv_path, chunk_lines):
+        try:
+            df, skipped = _parse_c(header, block, columns)
+        except ParserError:
+            df, skipped = _parse_python(header, block, columns)
+            stats["fallback_chunks"] += 1
+
+        before = len(df)
+        df = df.dropna(subset=[c for c in required if c in df.columns])
+
+        stats["chunks"] += 1
+        stats["skipped_lines"] += skipped
+        stats["dropped_rows"] += before - len(df)
+        stats["rows"] += len(df)
+
+        if len(df):
+            yield df
+
+
+def load_reviews(csv_path, **kwargs):
+    chunks = list(iter_review_chunks(csv_path, **kwargs))
+    if not chunks:
+        return pd.DataFrame(columns=kwargs.get("columns", REVIEW_COLUMNS))
+    return pd.concat(chunks, ignore_index=True)
+
+
+# =========================
+# AGREGASI PER TOKO (STREAMING)
+# =========================
+def aggregate_reviews(chunks, preprocess_fn, keep_parts=False):
+    # Setara dengan groupby("name").agg({clean_review: " ".join,
+    # rating: "mean", area: "first", address: "first"}) + n_reviews dan
+    # rating_n (jumlah review ber-rating, pembagi rata-rata rating),
+    # tanpa menyimpan seluruh review mentah di memori. keep_parts=True
+    # menambah kolom review_parts (list clean_review per toko).
+    shops = {}
+
+    for df in chunks:
+        clean = preprocess_fn(df["review_text"].tolist())
+        for name, text, rating, area, address in zip(
+            df["name"], clean, df["rating"], df["area"], df["address"]
+        ):
+            shop = shops.get(name)
+            if shop is None:
+                shop = shops[name] = {
+                    "parts": [], "rating_sum": 0.0, "rating_n": 0,
+                    "area": None, "address": None, "n": 0
+                }
+            shop["parts"].append(text)
+            shop["n"] += 1
+            if rating == rating:
+                shop["rating_sum"] += rating
+                shop["rating_n"] += 1
+            # "first" pada groupby = nilai non-null pertama
+            if shop["area"] is None and area == area:
+                shop["area"] = area
+            if shop["address"] is None and address == address:
+                shop["address"] = address
+
+    names = sorted(shops)
+    df_agg = pd.DataFrame({
+        "name": names,
+        "clean_review": [" ".join(shops[n]["parts"]) for n in names],
+        "rating": [
+            shops[n]["rating_sum"] / shops[n]["rating_n"] if shops[n]["rating_n"] else float("nan")
+            for n in names
+        ],
+        "area": [shops[n]["area"] for n in names],
+        "address": [shops[n]["address"] for n in names],
+        "n_reviews": [shops[n]["n"] for n in names],
+        "rating_n": [shops[n]["rating_n"] for n in names],
+    })
+    if keep_parts:
+        df_agg["review_parts"] = [shops[n]["parts"] for n in names]
+    return df_agg
@@ -0,0 +1,142 @@
+import zlib
+import numpy as np
+
+# =========================
+# ENCODER
+# =========================
+# Encoder apa pun yang punya encode(texts, batch_size=..., show_progress_bar=...)
+# -> array (n, dim) bisa dipakai (SentenceTransformer, atau stub di bawah).
+
+
+def encoder_name(encoder):
+    for attr in ("model_name", "name_or_path"):
+        if getattr(encoder, attr, None):
+            return getattr(encoder, attr)
+    return type(encoder).__name__
+
+
+class HashingEncoder:
+    # Encoder lokal tanpa model/jaringan untuk test & benchmark offline:
+    # bag-of-words yang di-hash ke `dim` dimensi, dipotong di
+    # max_seq_length token seperti transformer
+    def __init__(self, dim=384, max_seq_length=128):
+        self.dim = dim
+        self.max_seq_length = max_seq_length
+        self.model_name = f"hashing-{dim}-{max_seq_length}"
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, **_):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in str(text).split()[:self.max_seq_length]:
+                h = zlib.crc32(token.encode("utf-8"))
+                out[i, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return out
+
+
+# =========================
+# CHUNKING
+# =========================
+DEFAULT_CHUNK_TOKENS = 96
+
+
+def token_counter(encoder):
+    # Jumlah token model per kata lewat tokenizer encoder (SentenceTransformer
+    # punya .tokenizer HuggingFace); None -> satu kata dihitung satu token
+    # (encoder stub tanpa tokenizer, mis. HashingEncoder)
+    tokenizer = getattr(encoder, "tokenizer", None)
+    if tokenizer is None or not hasattr(tokenizer, "tokenize"):
+        return None
+    counts = {}
+
+    def count(word):
+        n = counts.get(word)
+        if n is None:
+            n = counts[word] = max(1, len(tokenizer.tokenize(word)))
+        return n
+
+    return count
+
+
+def chunk_budget(encoder, default=DEFAULT_CHUNK_TOKENS):
+    # Budget token per chunk = max_seq_length encoder dikurangi token khusus
+    # tokenizer ([CLS] / [SEP]); default bila encoder tidak punya batas
+    limit = getattr(encoder, "max_seq_length", None)
+    if not limit:
+        return default
+    tokenizer = getattr(encoder, "tokenizer", None)
+    special = tokenizer.num_special_tokens_to_add() if hasattr(tokenizer, "num_special_tokens_to_add") else 0
+    return max(1, int(limit) - special)
+
+
+def chunk_reviews(reviews, max_tokens=DEFAULT_CHUNK_TOKENS, count_tokens=None):
+    # Gabungkan review satu toko menjadi potongan <= max_tokens token model
+    # (count_tokens(kata) -> jumlah token, lihat token_counter; None = jumlah
+    # kata); review yang terlalu panjang dipecah per kata
+    chunks, current, used = [], [], 0
+    for review in reviews:
+        words = review.split()
+        sizes = [count_tokens(w) for w in words] if count_tokens else [1] * len(words)
+        total = sum(sizes)
+        if current and (used + total > max_tokens or total > max_tokens):
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        if total <= max_tokens:
+            current.extend(words)
+            used += total
+            continue
+        for word, size in zip(words, sizes):
+            if current and used + size > max_tokens:
+                chunks.append(" ".join(current))
+                current, used = [], 0
+            current.append(word)
+            used += size
+    if current or not chunks:
+        # Toko tanpa teks tetap punya satu chunk (kosong) agar offset valid
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def encode_sorted(encoder, texts, batch_size=64):
+    # Batch disusun berdasarkan panjang teks agar padding per batch minimal,
+    # lalu hasil dikembalikan ke urutan semula
+    order = np.argsort([len(t) for t in texts], kind="stable")[::-1]
+    parts = []
+    for start in range(0, len(order), batch_size):
+        batch = [texts[i] for i in order[start:start + batch_size]]
+        parts.append(np.asarray(
+            encoder.encode(batch, batch_size=batch_size, show_progress_bar=False),
+            dtype=np.float32
+        ))
+    out = np.empty((len(texts), parts[0].shape[1]) if parts else (0, 0), dtype=np.float32)
+    if parts:
+        out[order] = np.vstack(parts)
+    return out
+
+
+def pool_chunks(chunk_emb, offsets, mode="mean"):
+    # offsets[i]:offsets[i+1] = chunk milik toko i (setiap toko >= 1 chunk)
+    starts = offsets[:-1]
+    if mode == "max":
+        return np.maximum.reduceat(chunk_emb, starts, axis=0)
+    sums = np.add.reduceat(chunk_emb, starts, axis=0)
+    return sums / np.diff(offsets)[:, None]
+
+
+def embed_shops(shop_reviews, encoder, max_tokens=None, batch_size=64, pooling="mean"):
+    # shop_reviews: list (per toko) berisi list clean_review.
+    # max_tokens=None: budget dari max_seq_length encoder (chunk_budget)
+    if max_tokens is None:
+        max_tokens = chunk_budget(encoder)
+    count_tokens = token_counter(encoder)
+    chunks, offsets = [], [0]
+    for reviews in shop_reviews:
+        chunks.extend(chunk_reviews(reviews, max_tokens, count_tokens))
+        offsets.append(len(chunks))
+    offsets = np.asarray(offsets, dtype=np.int64)
+
+    chunk_emb = encode_sorted(encoder, chunks, batch_size)
+    norms = np.linalg.norm(chunk_emb, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    chunk_emb = chunk_emb / norms
+
+    return pool_chunks(chunk_emb, offsets, pooling), chunk_emb, offsets
@@ -0,0 +1,143 @@
+import os
+import json
+import numpy as np
+
+try:
+    from src.vector_index import normalize_rows, top_k_rows, INDEX_META
+    from src.artifact_store import replace_atomic
+except ModuleNotFoundError:
+    from vector_index import normalize_rows, top_k_rows, INDEX_META
+    from artifact_store import replace_atomic
+
+STORE_DTYPES = ("float32", "float16", "int8")
+SCORE_BLOCK = 1024
+
+
+# =========================
+# KUANTISASI
+# =========================
+def quantize(vectors, dtype="int8"):
+    # Vektor dinormalisasi dulu, jadi cosine = dot product.
+    # int8: skala per vektor (max |x| / 127), x ~= codes * scale
+    vectors = normalize_rows(vectors)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"dtype tidak dikenal: {dtype}")
+
+
+def dequantize(codes, scales=None):
+    out = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        out = out * scales[:, None]
+    return out
+
+
+# =========================
+# EMBEDDING STORE
+# =========================
+class EmbeddingStore:
+    # Embedding toko dalam float16 / int8 (+ skala per vektor). Interface
+    # sama dengan ExactIndex (score_all, search, save, load) sehingga bisa
+    # dipakai langsung sebagai vector_index RecommenderEngine. Dengan
+    # load(mmap=True) beberapa proses worker berbagi satu salinan file di
+    # page cache; skor dihitung per blok baris tanpa dekuantisasi penuh.
+    # Trade-off: int8 (1/4 memori float32) scoring ~2x float32, sedangkan
+    # float16 (1/2 memori) ~15x float32 per query karena konversi
+    # float16 -> float32 di numpy lambat. float16 hanya untuk memori yang
+    # sangat terbatas; default di semua jalur adalah float32 / int8.
+    kind = "quantized"
+    approximate = False
+
+    def __init__(self, codes, scales=None):
+        self.codes = codes
+        self.scales = scales
+        self.dtype = str(codes.dtype)
+
+    @classmethod
+    def from_vectors(cls, vectors, dtype="int8"):
+        return cls(*quantize(vectors, dtype))
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def vectors(self):
+        # Materialisasi float32 (mis. untuk refit); tidak dipakai saat scoring
+        return dequantize(self.codes, self.scales)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    def score_all(self, queries):
+        q = normalize_rows(queries)
+        out = np.empty((len(q), len(self.codes)), dtype=np.float32)
+        for s in range(0, len(self.codes), SCORE_BLOCK):
+            # Cast per blok menjaga memori tetap kecil; untuk float16 inilah
+            # biaya latency utamanya (lihat bench_embedding_store.py)
+            block = np.asarray(self.codes[s:s + SCORE_BLOCK], dtype=np.float32)
+            out[:, s:s + SCORE_BLOCK] = q @ block.T
+        if self.scales is not None:
+            out *= self.scales[None, :]
+        return out
+
+    def search(self, queries, k):
+        return top_k_rows(self.score_all(queries), k)
+
+    # ---------- persist ----------
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "codes.npy"), self.codes)
+        if self.scales is not None:
+            np.save(os.path.join(path, "scales.npy"), self.scales)
+        with open(os.path.join(path, INDEX_META), "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind, "dtype": self.dtype}, f)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mode = "r" if mmap else None
+        codes = np.load(os.path.join(path, "codes.npy"), mmap_mode=mode)
+        scales_file = os.path.join(path, "scales.npy")
+        scales = np.load(scales_file) if os.path.exists(scales_file) else None
+        return cls(codes, scales)
+
+
+def store_path(artifact_dir, dtype):
+    return os.path.join(artifact_dir, f"store_{dtype}")
+
+
+def open_store(artifact_dir, embeddings, dtype="int8", mmap=True):
+    # Store dibuat sekali di samping artifact lalu selalu dibuka via mmap,
+    # sehingga proses pertama yang menulis dan proses lain cukup membaca
+    path = store_path(artifact_dir, dtype)
+    if not os.path.exists(os.path.join(path, INDEX_META)):
+        replace_atomic(path, EmbeddingStore.from_vectors(embeddings, dtype).save)
+    return EmbeddingStore.load(path, mmap=mmap)
+
+
+# =========================
+# KESESUAIAN RANKING
+# =========================
+def ranking_agreement(exact_scores, approx_scores, k=10):
+    # Dibandingkan per query: overlap top-k, apakah top-1 sama, dan error
+    # skor absolut maksimum terhadap float32
+    k = min(k, exact_scores.shape[1])
+    exact_top, _ = top_k_rows(exact_scores, k)
+    approx_top, _ = top_k_rows(approx_scores, k)
+    overlap = [
+        len(np.intersect1d(a, b)) / k for a, b in zip(exact_top, approx_top)
+    ]
+    return {
+        f"overlap@{k}": float(np.mean(overlap)),
+        "top1_agreement": float((exact_top[:, 0] == approx_top[:, 0]).mean()),
+        "exact_order@k": float((exact_top == approx_top).all(axis=1).mean()),
+        "max_abs_error": float(np.abs(exact_scores - approx_scores).max()),
+    }
@@ -0,0 +1,507 @@
+import os
+import threading
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+try:
+    from src.recommender import SEGMENT_KEYWORDS, build_artifacts
+    from src.query_cache import QueryCache, normalize_query
+    from src.area_index import AreaIndex
+    from src.vector_index import ExactIndex, ChunkIndex, IVFIndex, open_ivf
+    from src.embedding_store import EmbeddingStore, open_store
+    from src import instrumentation
+    from src.lexical import LexicalScorer
+    from src.review_index import open_review_index
+    from src.keyword_matcher import KeywordMatcher
+    from src.catalogue import Catalogue, open_catalogue, KEYWORD_INDEX_DIR
+except ModuleNotFoundError:
+    from recommender import SEGMENT_KEYWORDS, build_artifacts
+    from query_cache import QueryCache, normalize_query
+    from area_index import AreaIndex
+    from vector_index import ExactIndex, ChunkIndex, IVFIndex, open_ivf
+    from embedding_store import EmbeddingStore, open_store
+    import instrumentation
+    from lexical import LexicalScorer
+    from review_index import open_review_index
+    from keyword_matcher import KeywordMatcher
+    from catalogue import Catalogue, open_catalogue, KEYWORD_INDEX_DIR
+
+
+# =========================
+# HELPER
+# =========================
+def minmax(values):
+    # Min/max dari rating yang ada saja; rating NaN (toko tanpa review
+    # ber-rating) tetap NaN seperti recommend() lama, dan top_k_indices
+    # menaruh skor NaN paling akhir
+    values = np.asarray(values, dtype=np.float64)
+    known = values[~np.isnan(values)]
+    if not len(known):
+        return values.copy()
+    return (values - known.min()) / (known.max() - known.min() + 1e-9)
+
+
+def build_segment_matrix(docs, segment_keywords=SEGMENT_KEYWORDS):
+    # Jumlah keyword segment yang muncul dibagi jumlah keyword, untuk semua
+    # dokumen x segment; pencocokan per token lewat KeywordMatcher
+    return KeywordMatcher(docs, segment_keywords).segment_matrix()
+
+
+def top_k_indices(scores, k):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    # Skor NaN diurutkan paling akhir, seperti sort_values() di recommend() lama
+    nan = np.isnan(scores)
+    if nan.any():
+        scores = np.where(nan, -np.inf, scores)
+
+    if k < len(scores):
+        # argpartition memilih acak di antara skor seri pada batas ke-k;
+        # ambil semua yang di atas batas + yang seri dengan indeks terkecil
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        top = np.concatenate([above, ties])
+    else:
+        top = np.arange(len(scores))
+
+    # Urutkan skor menurun; skor sama -> urutan baris asli
+    return top[np.lexsort((top, -scores[top]))]
+
+
+DEFAULT_WEIGHTS = (0.35, 0.25, 0.20, 0.20)
+
+
+def parse_query(query):
+    # Terima tuple (text, segment, lokasi, weights, top_k) atau dict
+    # dengan key yang sama; weights = (alpha, beta, gamma, delta) atau dict
+    if isinstance(query, dict):
+        text = query.get("user_text", query.get("text", ""))
+        segment = query.get("segment")
+        lokasi = query.get("lokasi")
+        weights = query.get("weights")
+        top_k = query.get("top_k", 5)
+    else:
+        query = tuple(query) + (None,) * (5 - len(query))
+        text, segment, lokasi, weights, top_k = query[:5]
+
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    elif isinstance(weights, dict):
+        weights = tuple(
+            weights.get(name, default)
+            for name, default in zip(("alpha", "beta", "gamma", "delta"), DEFAULT_WEIGHTS)
+        )
+
+    return text or "", segment, lokasi, tuple(weights), 5 if top_k is None else top_k
+
+
+# =========================
+# ENGINE
+# =========================
+class RecommenderEngine:
+    # Dibangun sekali dari output build_recommender(); semua bagian skor yang
+    # tidak bergantung pada query disiapkan di sini sebagai array NumPy
+
+    def __init__(self, df, tfidf, tfidf_matrix, sbert, embeddings,
+                 segment_keywords=SEGMENT_KEYWORDS, query_cache=None,
+                 vector_index=None, rerank_k=200, segment_match=None,
+                 empty_table_depth=50, lexical=None, artifact_key=None, keyword_path=None):
+        # df: DataFrame, atau Catalogue (Arrow mmap) yang tetap menjadi
+        # sumber metadata; hanya baris hasil yang dikonversi ke pandas
+        if isinstance(df, Catalogue):
+            self.catalogue, self.df = df, None
+            rating, areas = df.rating, df.areas
+        else:
+            self.catalogue, self.df = None, df.reset_index(drop=True)
+            rating, areas = self.df["rating"], self.df["area"]
+        # Key artifact (hash CSV + konfigurasi) untuk cache hasil di luar engine
+        self.artifact_key = artifact_key
+        self.tfidf = tfidf
+        self.sbert = sbert
+        # Encoding query (SBERT + TF-IDF) di-cache per teks ternormalisasi;
+        # QueryCache(maxsize=0) untuk mematikan
+        self.query_cache = QueryCache() if query_cache is None else query_cache
+
+        # Skor TF-IDF lewat matriks term -> dokumen yang sudah dinormalisasi;
+        # LexicalScorer(..., min_df=, max_df=, max_ngram=) untuk pruning
+        if lexical is None:
+            lexical = LexicalScorer(tfidf, tfidf_matrix)
+        self.lexical = lexical
+        self.tfidf_matrix = lexical.doc_terms
+
+        # Index vektor SBERT: ExactIndex (default) atau index aproksimasi
+        # (mis. IVFIndex) yang hanya menghasilkan rerank_k kandidat
+        if vector_index is None:
+            vector_index = ExactIndex(embeddings)
+        self.vector_index = vector_index
+        self.rerank_k = rerank_k
+
+        self.rating = np.asarray(rating, dtype=np.float64)
+        self.rating_norm = minmax(self.rating)
+        self.area_index = AreaIndex(areas)
+
+        self.segments = list(segment_keywords)
+        self.segment_index = {name: j for j, name in enumerate(self.segments)}
+        # Hit dokumen x keyword dihitung sekali; segment_match diturunkan
+        # dari matcher (atau diberikan, mis. dari IncrementalRecommender)
+        # keyword_path: posting n-gram tersimpan (folder artifact), dimuat
+        # saat add_segment() pertama bila teks review tidak ada
+        self.keyword_matcher = None
+        self.keyword_path = keyword_path
+        if segment_match is None:
+            self.keyword_matcher = KeywordMatcher(self.df["clean_review"], segment_keywords)
+            segment_match = self.keyword_matcher.segment_matrix(self.segments)
+        self.segment_match = segment_match
+
+        # Buffer skor berukuran tetap: kolom [sbert, tfidf, rating, segment]
+        n = len(self)
+        self._components = np.zeros((n, 4), dtype=np.float64, order="F")
+        self._components[:, 2] = self.rating_norm
+        self._scores = np.empty(n, dtype=np.float64)
+        self._lock = threading.Lock()
+
+        # Tabel ranking untuk query kosong; ikut dibangun ulang setiap kali
+        # engine dibuat dari artifact baru
+        self.empty_table_depth = empty_table_depth
+        self.empty_table = self.build_empty_table(empty_table_depth)
+
+    @classmethod
+    def build(cls, max_sim=False, embedding_dtype=None, lexical_pruning=None,
+              retrieval="shop", review_agg="max", top_m=3, catalogue=False,
+              vector_index="exact", n_lists=None, n_probe=8, **kwargs):
+        # max_sim=True (butuh embedding_mode="chunk"): skor SBERT = kemiripan
+        # maksimum terhadap chunk review, bukan terhadap vektor pooled toko.
+        # embedding_dtype="float16"/"int8": scoring langsung pada
+        # EmbeddingStore ter-kuantisasi yang di-mmap dari folder artifact
+        # (int8 disarankan; float16 hemat memori tapi scoring jauh lebih lambat).
+        # lexical_pruning: dict min_df / max_df / max_ngram untuk LexicalScorer.
+        # retrieval="review": SBERT & TF-IDF dihitung per review lalu
+        # diagregasi ke toko (review_agg = "max" / "mean" / "top_m").
+        # catalogue=True: df = katalog Arrow (name/area/address/rating, mmap)
+        # + segment_match tersimpan; teks review tidak dimuat ke worker.
+        # vector_index="ivf": kandidat SBERT dari IVFIndex (n_lists sel,
+        # n_probe sel per query) yang disimpan di folder artifact
+        if vector_index not in ("exact", "ivf"):
+            raise ValueError(f"vector_index tidak dikenal: {vector_index!r}")
+        if vector_index == "ivf" and (max_sim or embedding_dtype is not None or retrieval == "review"):
+            raise ValueError("vector_index='ivf' tidak bisa digabung dengan max_sim, "
+                             "embedding_dtype, atau retrieval='review'")
+        a = build_artifacts(load_df=not catalogue, keep_parts=retrieval == "review", **kwargs)
+        df, segment_match, keyword_path = a["df"], None, None
+        if catalogue and a["path"] is not None:
+            df, segment_match = open_catalogue(a["path"], SEGMENT_KEYWORDS, df)
+            keyword_path = os.path.join(a["path"], KEYWORD_INDEX_DIR)
+        index = None
+        if max_sim and a["chunk_embeddings"] is not None:
+            index = ChunkIndex(a["embeddings"], a["chunk_embeddings"], a["chunk_offsets"])
+        elif embedding_dtype is not None and a["path"] is not None:
+            index = open_store(a["path"], a["embeddings"], embedding_dtype)
+        elif embedding_dtype is not None:
+            index = EmbeddingStore.from_vectors(a["embeddings"], embedding_dtype)
+        elif vector_index == "ivf" and a["path"] is not None:
+            index = open_ivf(a["path"], a["embeddings"], n_lists, n_probe)
+        elif vector_index == "ivf":
+            index = IVFIndex(a["embeddings"], n_lists=n_lists, n_probe=n_probe)
+        lexical = None
+        if lexical_pruning:
+            lexical = LexicalScorer(a["tfidf"], a["tfidf_matrix"], **lexical_pruning)
+        if retrieval == "review":
+            reviews = open_review_index(
+                a["path"], encoder=a["sbert"], agg=review_agg, top_m=top_m,
+                review_parts=a["review_parts"],
+                **{k: v for k, v in kwargs.items() if k in ("csv_path", "n_workers", "chunk_size")}
+            )
+            if reviews.n_shops != len(df):
+                raise ValueError("review index tidak cocok dengan artifact toko")
+            index, lexical = reviews.vector_index(), reviews.lexical_scorer()
+        return cls(df, a["tfidf"], a["tfidf_matrix"], a["sbert"], a["embeddings"],
+                   vector_index=index, lexical=lexical, artifact_key=a["key"],
+                   segment_match=segment_match, keyword_path=keyword_path)
+
+    @property
+    def embeddings(self):
+        return self.vector_index.vectors
+
+    def add_segment(self, name, keywords):
+        # Segment custom saat runtime: skor diambil dari posting list n-gram
+        # KeywordMatcher, korpus tidak di-scan ulang
+        with self._lock:
+            if self.keyword_matcher is None:
+                if self.df is not None and "clean_review" in self.df:
+                    self.keyword_matcher = KeywordMatcher(self.df["clean_review"])
+                elif self.keyword_path is not None:
+                    self.keyword_matcher = KeywordMatcher.load(self.keyword_path)
+                else:
+                    raise ValueError("add_segment butuh clean_review atau posting keyword tersimpan")
+            scores = self.keyword_matcher.add_segment(name, keywords)
+
+            # Array baru lalu di-assign (bukan diubah in-place) supaya request
+            # yang sedang berjalan tetap melihat matriks yang konsisten
+            j = self.segment_index.get(name)
+            if j is None:
+                self.segment_match = np.column_stack([self.segment_match, scores])
+                self.segments = self.segments + [name]
+                self.segment_index = {**self.segment_index, name: len(self.segments) - 1}
+            else:
+                segment_match = self.segment_match.copy()
+                segment_match[:, j] = scores
+                self.segment_match = segment_match
+            self.empty_table = self.build_empty_table(self.empty_table_depth)
+        return scores
+
+    def __len__(self):
+        return len(self.rating)
+
+    @property
+    def names(self):
+        return self.catalogue.names if self.catalogue is not None else self.df["name"].tolist()
+
+    def rows(self, ids):
+        # Baris hasil (DataFrame, index = nomor baris); dari katalog hanya
+        # baris ini yang dikonversi ke pandas
+        if self.catalogue is not None:
+            return self.catalogue.frame(ids)
+        return self.df.iloc[ids]
+
+    # ---------- empty-query table ----------
+    def build_empty_table(self, depth, weights=DEFAULT_WEIGHTS):
+        # Tanpa teks, skor hanya gamma * rating_norm + delta * segment, jadi
+        # ranking cukup ditentukan oleh (segment, area): hitung semua di sini.
+        # Key: (segment | None, area ternormalisasi | None) -> (row id, skor)
+        _, _, gamma, delta = weights
+        seg_cols = [(name, self.segment_match[:, j]) for name, j in self.segment_index.items()]
+        seg_cols.append((None, np.zeros(len(self))))
+
+        areas = [(None, None)] + list(self.area_index.row_ids.items())
+        table = {}
+        for seg, match in seg_cols:
+            for area, ids in areas:
+                if ids is None:
+                    scores = gamma * self.rating_norm + delta * match
+                    rows = np.arange(len(self))
+                else:
+                    scores = gamma * minmax(self.rating[ids]) + delta * match[ids]
+                    rows = ids
+                top = top_k_indices(scores, depth)
+                table[seg, area] = self.rows(rows[top]).assign(score=scores[top])
+
+        self._empty_weights = (gamma, delta)
+        return table
+
+    def _lookup_empty(self, segment, lokasi, gamma, delta, top_k):
+        if (gamma, delta) != self._empty_weights or top_k > self.empty_table_depth:
+            return None
+
+        if lokasi and self.area_index.lookup(lokasi) is not None:
+            keys = self.area_index.match_keys(lokasi)
+            if len(keys) != 1:
+                # Cocok ke beberapa area (atau tidak ada) -> hitung biasa
+                return None
+            area = keys[0]
+        else:
+            area = None
+
+        seg = segment if segment in self.segment_index else None
+        return self.empty_table[seg, area].iloc[:top_k]
+
+    # ---------- query encoding ----------
+    def encode_queries(self, texts):
+        keys = [normalize_query(t) for t in texts]
+        encoded = {}
+        # Key ternormalisasi hanya untuk cache; yang di-encode teks asli
+        # dari kemunculan pertama (sama dengan recommend() lama)
+        missing, missing_text = [], []
+        for key, text in zip(keys, texts):
+            if key in encoded:
+                continue
+            hit = self.query_cache.get(key)
+            if hit is None:
+                missing.append(key)
+                missing_text.append(text)
+                encoded[key] = None
+            else:
+                encoded[key] = hit
+
+        instrumentation.count("query_cache_miss", len(missing))
+        if missing:
+            # Satu forward pass SBERT dan satu transform TF-IDF untuk semua miss
+            with instrumentation.stage("sbert_encode"):
+                new_emb = normalize(np.asarray(
+                    self.sbert.encode(missing_text, show_progress_bar=False),
+                    dtype=np.float32
+                ))
+            with instrumentation.stage("tfidf_transform"):
+                new_tf = self.lexical.transform(missing_text)
+            for i, key in enumerate(missing):
+                encoded[key] = (new_emb[i], new_tf[i])
+                self.query_cache.put(key, encoded[key])
+
+        user_emb = np.vstack([encoded[k][0] for k in keys])
+        user_tf = sp.vstack([encoded[k][1] for k in keys], format="csr")
+        return user_emb, user_tf
+
+    def similarities(self, user_text):
+        if not user_text or not user_text.strip():
+            return None, None
+
+        user_emb, user_tf = self.encode_queries([user_text])
+        with instrumentation.stage("vector_score"):
+            sim_sbert = self.vector_index.score_all(user_emb)[0]
+        with instrumentation.stage("tfidf_score"):
+            sim_tfidf = self.lexical.score_one(user_tf)
+        return sim_sbert, sim_tfidf
+
+    # ---------- filter ----------
+    def candidates(self, lokasi):
+        # Row id kandidat (read-only) atau None bila tanpa filter lokasi
+        return self.area_index.lookup(lokasi)
+
+    # ---------- scoring ----------
+    def _score_into(self, sim_sbert, sim_tfidf, segment, weights, ids=None):
+        comp = self._components
+
+        if sim_sbert is None:
+            comp[:, 0] = 0.0
+            comp[:, 1] = 0.0
+        else:
+            comp[:, 0] = sim_sbert
+            comp[:, 1] = sim_tfidf
+
+        j = self.segment_index.get(segment)
+        if j is None:
+            comp[:, 3] = 0.0
+        else:
+            comp[:, 3] = self.segment_match[:, j]
+
+        if ids is None:
+            np.dot(comp, weights, out=self._scores)
+            return self._scores
+
+        # Rating dinormalisasi ulang terhadap kandidat, seperti recommend()
+        sub = comp[ids]
+        sub[:, 2] = minmax(self.rating[ids])
+        return sub @ weights
+
+    def _recommend_ann(self, user_text, segment, weights, top_k):
+        # Kandidat dari index aproksimasi, lalu rerank hybrid hanya pada
+        # kandidat tersebut (TF-IDF, rating, segment)
+        user_emb, user_tf = self.encode_queries([user_text])
+        with instrumentation.stage("vector_search"):
+            cand, dense = self.vector_index.search(user_emb, max(self.rerank_k, top_k))
+        keep = cand[0] >= 0
+        cand, dense = cand[0][keep], dense[0][keep]
+
+        j = self.segment_index.get(segment)
+        comp = np.column_stack([
+            dense,
+            self.lexical.score_rows(user_tf, cand),
+            self.rating_norm[cand],
+            self.segment_match[cand, j] if j is not None else np.zeros(len(cand)),
+        ])
+        scores = comp @ weights
+        top = top_k_indices(scores, top_k)
+        return self.rows(cand[top]).assign(score=scores[top])
+
+    def recommend(self, user_text="", segment=None, lokasi=None,
+                  alpha=0.35, beta=0.25, gamma=0.20, delta=0.20, top_k=5):
+        with instrumentation.request("recommend"):
+            return self._recommend(user_text, segment, lokasi, alpha, beta, gamma, delta, top_k)
+
+    def _recommend(self, user_text, segment, lokasi, alpha, beta, gamma, delta, top_k):
+        with instrumentation.stage("area_filter"):
+            ids = self.candidates(lokasi)
+        if ids is not None and len(ids) == 0:
+            return self.rows(np.empty(0, dtype=np.intp)).assign(score=np.empty(0))
+
+        if not user_text or not user_text.strip():
+            with instrumentation.stage("empty_table"):
+                hit = self._lookup_empty(segment, lokasi, gamma, delta, top_k)
+            if hit is not None:
+                instrumentation.count("empty_table_hit")
+                return hit
+
+        weights = np.array([alpha, beta, gamma, delta], dtype=np.float64)
+        use_ann = self.vector_index.approximate and ids is None
+        if use_ann and user_text and user_text.strip():
+            return self._recommend_ann(user_text, segment, weights, top_k)
+
+        sim_sbert, sim_tfidf = self.similarities(user_text)
+
+        with self._lock, instrumentation.stage("rank"):
+            scores = self._score_into(sim_sbert, sim_tfidf, segment, weights, ids)
+            top = top_k_indices(scores, top_k)
+            top_scores = scores[top].copy()
+
+        rows = top if ids is None else ids[top]
+        with instrumentation.stage("result_frame"):
+            return self.rows(rows).assign(score=top_scores)
+
+    def recommend_batch(self, queries, chunk_size=256):
+        with instrumentation.request("recommend_batch"):
+            instrumentation.count("batch_queries", len(queries))
+            return self._recommend_batch(queries, chunk_size)
+
+    def _recommend_batch(self, queries, chunk_size):
+        queries = [parse_query(q) for q in queries]
+        m, n = len(queries), len(self)
+
+        texts = [q[0] for q in queries]
+        has_text = np.array([bool(t.strip()) for t in texts])
+        text_rows = np.flatnonzero(has_text)
+
+        if len(text_rows):
+            user_emb, user_tf = self.encode_queries([texts[i] for i in text_rows])
+        # posisi setiap query di hasil encode (hanya query berteks)
+        text_pos = np.full(m, -1)
+        text_pos[text_rows] = np.arange(len(text_rows))
+
+        weights = np.array([q[3] for q in queries], dtype=np.float64)
+        seg_cols = np.array([self.segment_index.get(q[1], -1) for q in queries])
+        # Kolom tambahan bernilai nol untuk segment yang tidak dikenal
+        seg_match = np.hstack([self.segment_match, np.zeros((n, 1))])
+
+        results = []
+        for start in range(0, m, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, m))
+            pos = text_pos[rows]
+            w = weights[rows]
+
+            # (chunk x dokumen): rating + segment untuk semua query sekaligus
+            scores = (
+                w[:, 2:3] * self.rating_norm[None, :] +
+                w[:, 3:4] * seg_match[:, seg_cols[rows]].T
+            )
+
+            sel = np.flatnonzero(pos >= 0)
+            if len(sel):
+                with instrumentation.stage("vector_score"):
+                    sim_sbert = self.vector_index.score_all(user_emb[pos[sel]])
+                with instrumentation.stage("tfidf_score"):
+                    sim_tfidf = self.lexical.score(user_tf[pos[sel]])
+                scores[sel] += w[sel, 0:1] * sim_sbert + w[sel, 1:2] * sim_tfidf
+
+            for r, i in enumerate(rows):
+                _, _, lokasi, _, top_k = queries[i]
+                ids = self.candidates(lokasi)
+
+                if ids is None:
+                    top = top_k_indices(scores[r], top_k)
+                    results.append(self.rows(top).assign(score=scores[r, top]))
+                    continue
+
+                if len(ids) == 0:
+                    results.append(self.rows(np.empty(0, dtype=np.intp)).assign(score=np.empty(0)))
+                    continue
+
+                # Rating dinormalisasi ulang terhadap kandidat, seperti recommend()
+                sub = scores[r, ids] + w[r, 2] * (
+                    minmax(self.rating[ids]) - self.rating_norm[ids]
+                )
+                top = top_k_indices(sub, top_k)
+                results.append(self.rows(ids[top]).assign(score=sub[top]))
+
+        return results
@@ -0,0 +1,289 @@
+import os
+import json
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+
+try:
+    from src.recommender import CSV_PATH
+    from src.data_loader import load_reviews
+    from src.engine import RecommenderEngine, DEFAULT_WEIGHTS, parse_query, minmax
+except ModuleNotFoundError:
+    from recommender import CSV_PATH
+    from data_loader import load_reviews
+    from engine import RecommenderEngine, DEFAULT_WEIGHTS, parse_query, minmax
+
+# =========================
+# PATH
+# =========================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_DIR = os.path.join(BASE_DIR, "models", "report")
+
+WEIGHT_NAMES = ("alpha", "beta", "gamma", "delta")
+ALL_SEGMENTS = "(semua)"
+NO_SEGMENT = "(tanpa segment)"
+# Batas elemen (bobot x query x toko) per blok skor saat evaluasi
+BLOCK_ELEMENTS = 1 << 24
+
+
+# =========================
+# QUERY SET
+# =========================
+def load_query_set(path):
+    # JSON list atau JSONL; setiap query: {"user_text", "segment", "lokasi",
+    # "relevant"}. relevant = list nama toko (relevansi 1) atau
+    # {nama toko: grade}
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def known_item_queries(engine, csv_path=CSV_PATH, n_queries=500, n_words=8, min_words=4, seed=42):
+    # Query set sintetis tanpa label manual: potongan awal satu review acak
+    # sebagai query, toko asal review sebagai satu-satunya toko relevan.
+    # Segment = segment dengan skor keyword tertinggi untuk toko tersebut.
+    # Condong ke TF-IDF (kata query ada di dokumen toko); gunakan query set
+    # berlabel bila tersedia.
+    rng = np.random.default_rng(seed)
+    reviews = load_reviews(csv_path, columns=["name", "review_text"])
+    words = reviews["review_text"].astype(str).str.split()
+    reviews = reviews[words.str.len() >= min_words]
+
+    row_of = {name: i for i, name in enumerate(engine.names)}
+    picks = rng.choice(len(reviews), size=min(n_queries, len(reviews)), replace=False)
+
+    queries = []
+    for name, text in reviews.iloc[picks][["name", "review_text"]].itertuples(index=False):
+        row = row_of.get(name)
+        if row is None:
+            continue
+        seg = engine.segment_match[row]
+        segment = engine.segments[int(seg.argmax())] if seg.max() > 0 else None
+        queries.append({
+            "user_text": " ".join(str(text).split()[:n_words]),
+            "segment": segment,
+            "lokasi": None,
+            "relevant": [name],
+        })
+    return queries
+
+
+def relevance_matrix(queries, names):
+    # (query x toko) grade relevansi, 0 = tidak relevan
+    col = {name: j for j, name in enumerate(names)}
+    rel = np.zeros((len(queries), len(names)), dtype=np.float32)
+    for i, q in enumerate(queries):
+        relevant = q.get("relevant") or []
+        if not isinstance(relevant, dict):
+            relevant = {name: 1.0 for name in relevant}
+        for name, grade in relevant.items():
+            j = col.get(name)
+            if j is not None:
+                rel[i, j] = grade
+    return rel
+
+
+# =========================
+# MATRIKS KOMPONEN SKOR
+# =========================
+class ComponentScores:
+    # Empat komponen skor hybrid per (query x toko), dihitung sekali:
+    # components[c] dengan c = [sbert, tfidf, rating_norm, segment].
+    # Skor untuk bobot w = w . components; toko di luar filter lokasi
+    # ditandai mask=False (sama dengan area_filter di engine).
+
+    def __init__(self, components, mask, segments):
+        self.components = components
+        self.mask = mask
+        self.segments = segments
+
+    @property
+    def shape(self):
+        return self.components.shape[1:]
+
+    @classmethod
+    def from_engine(cls, engine, queries, batch_size=256):
+        queries = [parse_query(q) for q in queries]
+        m, n = len(queries), len(engine)
+        components = np.zeros((4, m, n), dtype=np.float32)
+        mask = np.ones((m, n), dtype=bool)
+
+        # SBERT + TF-IDF: encode semua query berteks per batch
+        rows = [i for i, q in enumerate(queries) if q[0].strip()]
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            user_emb, user_tf = engine.encode_queries([queries[i][0] for i in chunk])
+            components[0, chunk] = engine.vector_index.score_all(user_emb)
+            components[1, chunk] = engine.lexical.score(user_tf)
+
+        components[2] = engine.rating_norm
+        for i, (_, segment, lokasi, _, _) in enumerate(queries):
+            ids = engine.candidates(lokasi)
+            if ids is not None:
+                # Rating dinormalisasi ulang terhadap kandidat, seperti recommend()
+                mask[i] = False
+                mask[i, ids] = True
+                if len(ids):
+                    components[2, i, ids] = minmax(engine.rating[ids])
+            j = engine.segment_index.get(segment)
+            if j is not None:
+                components[3, i] = engine.segment_match[:, j]
+
+        return cls(components, mask, [q[1] for q in queries])
+
+    def scores(self, weights):
+        # weights (b, 4) -> skor (b, query, toko); toko di luar mask = -inf
+        weights = np.asarray(weights, dtype=np.float32).reshape(-1, 4)
+        out = np.tensordot(weights, self.components, axes=(1, 0))
+        # Skor NaN (rating kosong) = peringkat terakhir, seperti engine
+        out[np.isnan(out)] = -np.inf
+        out[:, ~self.mask] = -np.inf
+        return out
+
+
+# =========================
+# METRIK RANKING (VEKTORISASI)
+# =========================
+def ideal_dcg(rel, k):
+    k = min(k, rel.shape[-1])
+    top = -np.sort(-rel, axis=-1)[..., :k]
+    return (top / np.log2(np.arange(2, k + 2))).sum(axis=-1)
+
+
+def rank_metrics(scores, rel, k=5):
+    # scores (b, m, n), rel (m, n) -> dict metrik per (bobot, query) (b, m).
+    # NDCG@k & recall@k dari top-k (argpartition), MRR dari peringkat toko
+    # relevan terbaik = jumlah toko dengan skor lebih tinggi + 1
+    n = scores.shape[-1]
+    k = min(k, n)
+    top = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=-1), axis=-1, kind="stable")
+    top = np.take_along_axis(top, order, axis=-1)
+
+    gains = np.take_along_axis(np.broadcast_to(rel, scores.shape), top, axis=-1)
+    dcg = (gains / np.log2(np.arange(2, k + 2))).sum(axis=-1)
+    idcg = ideal_dcg(rel, k)
+    n_rel = (rel > 0).sum(axis=-1)
+
+    best_rel = np.where(rel > 0, scores, -np.inf).max(axis=-1)
+    rank = (scores > best_rel[..., None]).sum(axis=-1) + 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return {
+            f"ndcg@{k}": dcg / idcg,
+            "mrr": np.where(n_rel > 0, 1.0 / rank, np.nan),
+            f"recall@{k}": (gains > 0).sum(axis=-1) / n_rel,
+        }
+
+
+def evaluate_weights(components, rel, weights, k=5):
+    # Metrik (bobot x query) untuk semua kandidat bobot, diproses per blok
+    # supaya array skor (blok x query x toko) tetap kecil
+    weights = np.asarray(weights, dtype=np.float64).reshape(-1, 4)
+    m, n = components.shape
+    # Toko relevan di luar filter lokasi tidak mungkin direkomendasikan
+    rel = np.where(components.mask, rel, 0).astype(np.float32)
+    block = max(1, BLOCK_ELEMENTS // max(m * n, 1))
+
+    parts = []
+    for start in range(0, len(weights), block):
+        parts.append(rank_metrics(components.scores(weights[start:start + block]), rel, k))
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+# =========================
+# KANDIDAT BOBOT
+# =========================
+def weight_grid(step=0.05):
+    # Semua bobot kelipatan `step` dengan jumlah 1 (ranking tidak berubah
+    # jika semua bobot dikali konstanta, jadi cukup di simplex)
+    n = int(round(1 / step))
+    grid = [(a, b, c, n - a - b - c)
+            for a, b, c in itertools.product(range(n + 1), repeat=3) if a + b + c <= n]
+    return np.array(grid, dtype=np.float64) / n
+
+
+def random_weights(n_samples=2000, seed=42):
+    return np.random.default_rng(seed).dirichlet(np.ones(4), size=n_samples)
+
+
+# =========================
+# TUNING
+# =========================
+def tune_weights(components, rel, weights=None, k=5, metric="ndcg", baseline=DEFAULT_WEIGHTS):
+    # Bobot terbaik per segment (dan untuk semua query) berdasarkan rata-rata
+    # metrik; baris pertama kandidat = baseline untuk pembanding
+    if weights is None:
+        weights = weight_grid()
+    weights = np.vstack([np.asarray(baseline, dtype=np.float64), weights])
+    results = evaluate_weights(components, rel, weights, k)
+    metric = next(name for name in results if name.startswith(metric))
+
+    segments = np.array(
+        [s if s is not None else NO_SEGMENT for s in components.segments], dtype=object
+    )
+    groups = [(ALL_SEGMENTS, np.ones(len(segments), dtype=bool))]
+    groups += [(s, segments == s) for s in dict.fromkeys(segments)]
+
+    rows = []
+    for name, sel in groups:
+        # Query tanpa toko relevan (NaN) tidak ikut dirata-rata
+        valid = sel & ~np.isnan(results[metric][0])
+        if not valid.any():
+            continue
+        means = {m: np.nanmean(v[:, valid], axis=1) for m, v in results.items()}
+        best = int(np.argmax(means[metric]))
+        row = {"segment": name, "queries": int(valid.sum())}
+        row.update(zip(WEIGHT_NAMES, weights[best]))
+        row.update({m: float(v[best]) for m, v in means.items()})
+        row.update({f"baseline_{m}": float(v[0]) for m, v in means.items()})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def write_report(report, out_dir=REPORT_DIR, name="weight_tuning"):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}.csv")
+    report.to_csv(path, index=False)
+    return path
+
+
+# =========================
+# CLI
+# =========================
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", default=None, help="JSON / JSONL query berlabel")
+    parser.add_argument("--n-queries", type=int, default=500)
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--step", type=float, default=0.05)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--metric", choices=["ndcg", "mrr", "recall"], default="ndcg")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default=REPORT_DIR)
+    args = parser.parse_args()
+
+    engine = RecommenderEngine.build()
+    if args.queries:
+        queries = load_query_set(args.queries)
+    else:
+        queries = known_item_queries(engine, n_queries=args.n_queries, seed=args.seed)
+
+    components = ComponentScores.from_engine(engine, queries)
+    rel = relevance_matrix(queries, engine.names)
+    if args.search == "grid":
+        weights = weight_grid(args.step)
+    else:
+        weights = random_weights(args.samples, args.seed)
+
+    report = tune_weights(components, rel, weights, k=args.k, metric=args.metric)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(report.round(4).to_string(index=False))
+    print("\nReport:", write_report(report, args.out_dir))
+
+
+if __name__ == "__main__":
+    main()
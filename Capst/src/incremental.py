@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+try:
+    from src.recommender import build_artifacts, SEGMENT_KEYWORDS, TFIDF_PARAMS, CSV_PATH
+    from src.text_preprocessing import preprocess_parallel
+    from src.data_loader import iter_review_chunks, aggregate_reviews
+    from src.embedding import embed_shops
+    from src.engine import RecommenderEngine, build_segment_matrix
+    from src import artifact_store
+except ModuleNotFoundError:
+    from recommender import build_artifacts, SEGMENT_KEYWORDS, TFIDF_PARAMS, CSV_PATH
+    from text_preprocessing import preprocess_parallel
+    from data_loader import iter_review_chunks, aggregate_reviews
+    from embedding import embed_shops
+    from engine import RecommenderEngine, build_segment_matrix
+    import artifact_store
+
+EMBEDDING_MODES = ("concat", "chunk")
+
+
+# =========================
+# INCREMENTAL INGESTION
+# =========================
+class IncrementalRecommender:
+    # Menyimpan artifact recommender dan memperbaruinya per batch review
+    # baru: hanya review baru yang di-preprocess, hanya toko yang berubah
+    # yang di-encode ulang, dan TF-IDF di-transform dengan vocabulary beku.
+    # Vectorizer di-fit ulang penuh setelah refit_ratio dari toko berubah.
+    # Toko di-encode ulang dengan embedding_mode yang sama dengan artifact
+    # ("concat", atau "chunk" + review_parts per toko); index per review
+    # (retrieval="review") tidak diperbarui, lihat save().
+
+    def __init__(self, df_agg, tfidf, tfidf_matrix, sbert, embeddings,
+                 refit_ratio=0.2, segment_keywords=SEGMENT_KEYWORDS,
+                 embedding_mode="concat", chunk_tokens=None, pooling="mean",
+                 review_parts=None):
+        if embedding_mode not in EMBEDDING_MODES:
+            raise ValueError(f"embedding_mode tidak didukung: {embedding_mode!r}")
+        if embedding_mode == "chunk" and review_parts is None:
+            raise ValueError("embedding_mode='chunk' butuh review_parts (list clean_review per toko)")
+        self.embedding_mode = embedding_mode
+        self.chunk_tokens = chunk_tokens
+        self.pooling = pooling
+        self.review_parts = [list(p) for p in review_parts] if embedding_mode == "chunk" else None
+
+        self.df = df_agg.reset_index(drop=True).copy()
+        if "n_reviews" not in self.df:
+            # Artifact lama tanpa jumlah review: anggap satu review per toko
+            self.df["n_reviews"] = 1
+        if "rating_n" not in self.df:
+            # Tanpa jumlah review ber-rating: anggap semua review toko
+            # ber-rating kecuali toko yang rating-nya NaN
+            self.df["rating_n"] = np.where(self.df["rating"].notna(), self.df["n_reviews"], 0)
+
+        self.tfidf = tfidf
+        self.tfidf_matrix = sp.csr_matrix(tfidf_matrix)
+        self.sbert = sbert
+        # Salinan yang bisa ditulis (embedding dari cache berupa memmap read-only)
+        self.embeddings = np.array(embeddings, dtype=np.float32)
+
+        self.segment_keywords = segment_keywords
+        self.segment_match = build_segment_matrix(self.df["clean_review"], segment_keywords)
+
+        self.refit_ratio = refit_ratio
+        self.stale_rows = set()
+        self.row_of = {name: i for i, name in enumerate(self.df["name"])}
+
+    @classmethod
+    def build(cls, refit_ratio=0.2, **kwargs):
+        a = build_artifacts(keep_parts=True, **kwargs)
+        mode = kwargs.get("embedding_mode", "concat")
+        parts = a["review_parts"]
+        if mode == "chunk" and parts is None:
+            # Cache hit: review per toko tidak ada di artifact, CSV dibaca
+            # ulang (urutan toko sama, diurutkan berdasarkan nama)
+            parts = aggregate_reviews(
+                iter_review_chunks(kwargs.get("csv_path", CSV_PATH)),
+                lambda texts: preprocess_parallel(texts, n_workers=kwargs.get("n_workers")),
+                keep_parts=True
+            )["review_parts"].tolist()
+        return cls(
+            a["df"], a["tfidf"], a["tfidf_matrix"], a["sbert"], a["embeddings"],
+            refit_ratio=refit_ratio, embedding_mode=mode,
+            chunk_tokens=kwargs.get("chunk_tokens"), pooling=kwargs.get("pooling", "mean"),
+            review_parts=parts
+        )
+
+    def artifacts(self):
+        return self.df, self.tfidf, self.tfidf_matrix, self.sbert, self.embeddings
+
+    def engine(self, **kwargs):
+        return RecommenderEngine(*self.artifacts(), segment_match=self.segment_match, **kwargs)
+
+    def save(self, path, meta=None):
+        # incremental=True: reviews/ (index per review) tidak boleh dibangun
+        # ulang dari CSV karena review baru tidak ada di sana
+        meta = dict(meta or {}, embedding_mode=self.embedding_mode, incremental=True)
+        return artifact_store.save_artifacts(
+            path, self.df, self.tfidf, self.tfidf_matrix, self.embeddings, meta=meta,
+            overwrite=True
+        )
+
+    # ---------- ingest ----------
+    def add_reviews(self, new_df, n_workers=1):
+        new_df = new_df.copy()
+        new_df.columns = new_df.columns.str.strip()
+        new_df = new_df.dropna(subset=["review_text", "name"]).reset_index(drop=True)
+        if new_df.empty:
+            return {"reviews": 0, "updated_shops": 0, "new_shops": 0, "refit": False}
+
+        new_df["clean_review"] = preprocess_parallel(
+            new_df["review_text"].tolist(), n_workers=n_workers
+        )
+
+        grouped = new_df.groupby("name", sort=False)
+        delta = grouped.agg({
+            "clean_review": " ".join,
+            "rating": "sum",
+            "area": "first",
+            "address": "first"
+        })
+        delta["n_reviews"] = grouped.size()
+        # "sum" melewati rating NaN, jadi pembaginya jumlah review ber-rating
+        # (sama dengan aggregate_reviews), bukan n_reviews
+        delta["rating_n"] = grouped["rating"].count()
+        if self.review_parts is not None:
+            delta["review_parts"] = grouped["clean_review"].agg(list)
+
+        updated, added = [], []
+        for name, row in delta.iterrows():
+            i = self.row_of.get(name)
+            if i is None:
+                added.append({
+                    "name": name,
+                    "clean_review": row["clean_review"],
+                    "rating": row["rating"] / row["rating_n"] if row["rating_n"] else np.nan,
+                    "area": row["area"],
+                    "address": row["address"],
+                    "n_reviews": row["n_reviews"],
+                    "rating_n": row["rating_n"],
+                })
+                if self.review_parts is not None:
+                    self.review_parts.append(list(row["review_parts"]))
+                continue
+
+            # Sama dengan " ".join atas semua review toko (review lama lebih dulu)
+            old_rn = self.df.at[i, "rating_n"]
+            rating_n = old_rn + row["rating_n"]
+            self.df.at[i, "clean_review"] = self.df.at[i, "clean_review"] + " " + row["clean_review"]
+            if rating_n:
+                old_sum = self.df.at[i, "rating"] * old_rn if old_rn else 0.0
+                self.df.at[i, "rating"] = (old_sum + row["rating"]) / rating_n
+            self.df.at[i, "n_reviews"] += row["n_reviews"]
+            self.df.at[i, "rating_n"] = rating_n
+            if self.review_parts is not None:
+                self.review_parts[i].extend(row["review_parts"])
+            updated.append(i)
+
+        if added:
+            start = len(self.df)
+            self.df = pd.concat([self.df, pd.DataFrame(added)], ignore_index=True)
+            for k, item in enumerate(added):
+                self.row_of[item["name"]] = start + k
+
+        changed = np.array(updated + list(range(len(self.df) - len(added), len(self.df))), dtype=np.intp)
+        self.stale_rows.update(changed.tolist())
+
+        refit = len(self.stale_rows) >= self.refit_ratio * len(self.df)
+        self._update_rows(changed, n_added=len(added), refit=refit)
+
+        return {
+            "reviews": len(new_df),
+            "updated_shops": len(updated),
+            "new_shops": len(added),
+            "refit": refit,
+        }
+
+    def _update_rows(self, changed, n_added, refit):
+        docs = self.df["clean_review"].iloc[changed].tolist()
+
+        # SBERT: encode ulang hanya toko yang teksnya berubah
+        new_emb = self._embed(changed, docs)
+        if n_added:
+            self.embeddings = np.vstack([
+                self.embeddings,
+                np.zeros((n_added, self.embeddings.shape[1]), dtype=np.float32)
+            ])
+            self.segment_match = np.vstack([
+                self.segment_match,
+                np.zeros((n_added, self.segment_match.shape[1]))
+            ])
+        self.embeddings[changed] = new_emb
+        self.segment_match[changed] = build_segment_matrix(docs, self.segment_keywords)
+
+        if refit:
+            self.refit()
+            return
+
+        # TF-IDF dengan vocabulary & idf beku: ganti baris yang berubah saja
+        new_rows = self.tfidf.transform(docs)
+        n_old = self.tfidf_matrix.shape[0]
+        stacked = sp.vstack([self.tfidf_matrix, new_rows], format="csr")
+        order = np.arange(n_old + n_added)
+        order[changed] = n_old + np.arange(len(changed))
+        self.tfidf_matrix = stacked[order]
+
+    def _embed(self, rows, docs):
+        # Sama dengan build_artifacts(): dokumen gabungan, atau chunk review
+        # yang di-pool dengan budget & pooling yang sama
+        if self.embedding_mode == "chunk":
+            pooled, _, _ = embed_shops(
+                [self.review_parts[i] for i in rows], self.sbert,
+                max_tokens=self.chunk_tokens, pooling=self.pooling
+            )
+            return pooled.astype(np.float32)
+        return np.asarray(self.sbert.encode(docs, show_progress_bar=False), dtype=np.float32)
+
+    def refit(self):
+        self.tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+        self.tfidf_matrix = self.tfidf.fit_transform(self.df["clean_review"])
+        self.stale_rows.clear()
@@ -0,0 +1,334 @@
+import os
+import time
+import heapq
+import bisect
+import random
+import logging
+import cProfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# =========================
+# STATE GLOBAL
+# =========================
+# Saat tidak ada sink, stage() mengembalikan satu objek no-op yang sama:
+# biaya per panggilan hanya satu cek list kosong.
+_sinks = []
+_profiler = None
+_current = contextvars.ContextVar("instrumentation_request", default=None)
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def enable(*sinks):
+    _sinks.extend(sinks)
+    return sinks[0] if len(sinks) == 1 else sinks
+
+
+def disable():
+    global _profiler
+    _sinks.clear()
+    _profiler = None
+
+
+def enabled():
+    return bool(_sinks) or _profiler is not None
+
+
+# =========================
+# STAGE & COUNTER
+# =========================
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        record = _current.get()
+        if record is not None:
+            record["stages"][self.name] = record["stages"].get(self.name, 0.0) + elapsed
+        for sink in _sinks:
+            sink.observe(self.name, elapsed)
+        return False
+
+
+def stage(name):
+    if not _sinks:
+        return _NULL
+    return _Stage(name)
+
+
+def count(name, value=1):
+    if not _sinks:
+        return
+    record = _current.get()
+    if record is not None:
+        record["counters"][name] = record["counters"].get(name, 0) + value
+    for sink in _sinks:
+        sink.incr(name, value)
+
+
+@contextmanager
+def _request_scope(name):
+    record = {"name": name, "stages": {}, "counters": {}}
+    token = _current.set(record)
+    profile = _profiler.maybe_start() if _profiler is not None else None
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["total"] = time.perf_counter() - start
+        if profile is not None:
+            _profiler.finish(profile, record)
+        _current.reset(token)
+        for sink in _sinks:
+            sink.observe(name, record["total"])
+            sink.request_done(record)
+
+
+def request(name):
+    # Satu request (recommend, submit streamlit, ...): stage di dalamnya
+    # dikumpulkan jadi satu record dan ikut dikirim ke sink di akhir
+    if not _sinks and _profiler is None:
+        return _NULL
+    if _current.get() is not None:
+        # Request bersarang (mis. recommend dari handler streamlit) dicatat
+        # sebagai stage dari request luar
+        return stage(name)
+    return _request_scope(name)
+
+
+# =========================
+# SINK
+# =========================
+class Sink:
+    def observe(self, name, seconds):
+        pass
+
+    def incr(self, name, value=1):
+        pass
+
+    def request_done(self, record):
+        pass
+
+
+class HistogramSink(Sink):
+    # Histogram kumulatif per stage (bucket dalam detik) + counter, di memori
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = {
+                    "counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0, "max": 0.0
+                }
+            h["counts"][bisect.bisect_left(self.buckets, seconds)] += 1
+            h["sum"] += seconds
+            h["count"] += 1
+            h["max"] = max(h["max"], seconds)
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def quantile(self, name, q):
+        # Batas atas bucket tempat kuantil q jatuh (perkiraan)
+        h = self.histograms.get(name)
+        if not h or not h["count"]:
+            return None
+        target = q * h["count"]
+        seen = 0
+        for bound, n in zip(self.buckets + (h["max"],), h["counts"]):
+            seen += n
+            if seen >= target:
+                return min(bound, h["max"])
+        return h["max"]
+
+    def summary(self):
+        with self._lock:
+            names = list(self.histograms)
+        return {
+            name: {
+                "count": self.histograms[name]["count"],
+                "mean_ms": self.histograms[name]["sum"] / self.histograms[name]["count"] * 1000,
+                "p50_ms": self.quantile(name, 0.50) * 1000,
+                "p95_ms": self.quantile(name, 0.95) * 1000,
+                "max_ms": self.histograms[name]["max"] * 1000,
+            }
+            for name in names
+        }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+class LogSink(Sink):
+    # Satu baris log per request: total + waktu per stage + counter
+    def __init__(self, logger=None, level=logging.INFO, min_ms=0.0):
+        self.logger = logger or logging.getLogger("recommender.timing")
+        self.level = level
+        self.min_ms = min_ms
+
+    def request_done(self, record):
+        total_ms = record["total"] * 1000
+        if total_ms < self.min_ms or not self.logger.isEnabledFor(self.level):
+            return
+        parts = [f"{record['name']} total={total_ms:.2f}ms"]
+        parts += [f"{k}={v * 1000:.2f}ms" for k, v in record["stages"].items()]
+        parts += [f"{k}={v}" for k, v in record["counters"].items()]
+        self.logger.log(self.level, " ".join(parts))
+
+
+class PrometheusSink(HistogramSink):
+    # Format teks Prometheus (text exposition 0.0.4) dari histogram di memori
+    def __init__(self, prefix="recommender", buckets=DEFAULT_BUCKETS):
+        super().__init__(buckets)
+        self.prefix = prefix
+
+    def render(self):
+        metric = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {metric} Waktu per stage pipeline rekomendasi.",
+                 f"# TYPE {metric} histogram"]
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, n in zip(self.buckets, h["counts"]):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{name}",le="+Inf"}} {h["count"]}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {h["sum"]}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {h["count"]}')
+
+            counter = f"{self.prefix}_events_total"
+            lines += [f"# HELP {counter} Counter pipeline rekomendasi.",
+                      f"# TYPE {counter} counter"]
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{counter}{{name="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+# =========================
+# SAMPLING PROFILER
+# =========================
+class ProfileSampler:
+    # Sebagian request (sample_rate) dijalankan di bawah cProfile; hanya
+    # profil dari `keep` request paling lambat yang disimpan ke out_dir
+    # sebagai <nama>_<ms>ms_<n>.prof (buka dengan pstats / snakeviz).
+    # Satu profil aktif pada satu waktu.
+
+    def __init__(self, out_dir, sample_rate=0.1, keep=5, seed=None):
+        self.out_dir = out_dir
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.slowest = []  # min-heap (total, n, path)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._busy = False
+        self._n = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def maybe_start(self):
+        with self._lock:
+            if self._busy or self._rng.random() >= self.sample_rate:
+                return None
+            self._busy = True
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Profiler lain sedang aktif di thread ini
+            with self._lock:
+                self._busy = False
+            return None
+        return profile
+
+    def finish(self, profile, record):
+        profile.disable()
+        with self._lock:
+            self._busy = False
+            self._n += 1
+            if len(self.slowest) >= self.keep and record["total"] <= self.slowest[0][0]:
+                return
+            path = os.path.join(
+                self.out_dir, f"{record['name']}_{record['total'] * 1000:.0f}ms_{self._n}.prof"
+            )
+            profile.dump_stats(path)
+            entry, dropped = (record["total"], self._n, path), None
+            if len(self.slowest) >= self.keep:
+                dropped = heapq.heappushpop(self.slowest, entry)
+            else:
+                heapq.heappush(self.slowest, entry)
+        if dropped is not None and os.path.exists(dropped[2]):
+            os.remove(dropped[2])
+
+
+def enable_profiling(out_dir, sample_rate=0.1, keep=5, seed=None):
+    global _profiler
+    _profiler = ProfileSampler(out_dir, sample_rate, keep, seed)
+    return _profiler
+
+
+# =========================
+# KONFIGURASI DARI ENV
+# =========================
+SINK_TYPES = {"histogram": HistogramSink, "log": LogSink, "prometheus": PrometheusSink}
+
+
+def configure_from_env(environ=None):
+    # RECOMMENDER_METRICS=log,prometheus   -> sink yang dipasang
+    # RECOMMENDER_PROFILE_DIR=profiles     -> aktifkan sampling cProfile
+    # RECOMMENDER_PROFILE_RATE=0.05, RECOMMENDER_PROFILE_KEEP=10
+    environ = os.environ if environ is None else environ
+    sinks = []
+    for name in environ.get("RECOMMENDER_METRICS", "").split(","):
+        name = name.strip().lower()
+        if name in SINK_TYPES and not any(type(s) is SINK_TYPES[name] for s in _sinks):
+            sinks.append(SINK_TYPES[name]())
+    if sinks:
+        enable(*sinks)
+
+    profile_dir = environ.get("RECOMMENDER_PROFILE_DIR")
+    if profile_dir and _profiler is None:
+        enable_profiling(
+            profile_dir,
+            sample_rate=float(environ.get("RECOMMENDER_PROFILE_RATE", 0.1)),
+            keep=int(environ.get("RECOMMENDER_PROFILE_KEEP", 5)),
+        )
+    return list(_sinks)
+
+
+def find_sink(sink_type):
+    for sink in _sinks:
+        if isinstance(sink, sink_type):
+            return sink
+    return None
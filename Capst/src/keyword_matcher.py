@@ -0,0 +1,218 @@
+import os
+import json
+import bisect
+import numpy as np
+import scipy.sparse as sp
+
+try:
+    from src.text_preprocessing import clean_text, tokenize, get_stopwords, stem_token
+except ModuleNotFoundError:
+    from text_preprocessing import clean_text, tokenize, get_stopwords, stem_token
+
+DEFAULT_MAX_NGRAM = 2
+POSTINGS_FILE = "postings.npz"
+TERMS_FILE = "terms.txt"
+META_FILE = "meta.json"
+
+
+# =========================
+# NORMALISASI KEYWORD
+# =========================
+def keyword_forms(keyword):
+    # Dokumen clean_review sudah melewati preprocess() (stopword & token
+    # <= 2 huruf dibuang, bahasa Indonesia di-stem), keyword belum.
+    # Keyword dicocokkan dalam bentuk mentah, tanpa stopword, dan ter-stem
+    # ("colokan" -> "colok") sehingga review Indonesia (ter-stem) maupun
+    # Inggris (tidak di-stem) sama-sama kena.
+    all_stop = get_stopwords()
+    raw = tokenize(clean_text(keyword))
+    kept = [t for t in raw if t not in all_stop and len(t) > 2]
+    stemmed = [stem_token(t) for t in kept]
+
+    forms = []
+    for tokens in (raw, kept, stemmed):
+        form = " ".join(tokens)
+        if form and form not in forms:
+            forms.append(form)
+    return forms
+
+
+def iter_ngrams(tokens, max_ngram):
+    for n in range(1, max_ngram + 1):
+        for i in range(len(tokens) - n + 1):
+            yield " ".join(tokens[i:i + n])
+
+
+# =========================
+# KEYWORD MATCHER
+# =========================
+class KeywordMatcher:
+    # Korpus di-scan sekali saat build: setiap dokumen dipecah jadi n-gram
+    # token (1..max_ngram) dan dicatat di matriks biner dokumen x n-gram
+    # (posting list per n-gram). Keyword = satu atau beberapa n-gram (lihat
+    # keyword_forms), jadi hit dokumen x keyword cukup dari kolom matriks
+    # tersebut tanpa substring scan. Segment baru (add_segment) hanya
+    # membaca posting list, korpus tidak di-scan ulang.
+    #
+    # prefix=True: keyword juga cocok dengan n-gram yang diawali keyword
+    # ("relax" -> "relaxing", "barista" -> "baristanya"), seperti substring
+    # di recommend() lama tetapi tetap di awal token ("view" tidak kena
+    # "review").
+
+    def __init__(self, docs, segment_keywords=None, max_ngram=DEFAULT_MAX_NGRAM, prefix=True):
+        vocab = {}
+        indptr, indices = [0], []
+        for doc in docs:
+            cols = {vocab.setdefault(g, len(vocab))
+                    for g in iter_ngrams(str(doc).split(), max_ngram)}
+            indices.extend(cols)
+            indptr.append(len(indices))
+
+        postings = sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.int8), np.array(indices, dtype=np.int64), indptr),
+            shape=(len(indptr) - 1, len(vocab))
+        ).tocsc()
+        # Kolom diurutkan mengikuti n-gram terurut: kolom j = terms[j],
+        # sehingga pencarian prefix dengan bisect langsung memberi rentang kolom
+        terms = sorted(vocab)
+        postings = postings[:, np.array([vocab[t] for t in terms], dtype=np.int64)]
+        self._setup(terms, postings, max_ngram, prefix, segment_keywords)
+
+    def _setup(self, terms, postings, max_ngram, prefix, segment_keywords):
+        self.max_ngram = max_ngram
+        self.prefix = prefix
+        self.terms = terms
+        # Disimpan CSC: kolom = posting list satu n-gram
+        self.postings = postings
+        self.n_docs = postings.shape[0]
+
+        self.keywords = []
+        self.keyword_index = {}
+        self._keyword_hits = []
+        self._hits = None
+        self.segments = {}
+        for name, keywords in (segment_keywords or {}).items():
+            self.add_segment(name, keywords)
+
+    # ---------- persist ----------
+    def save(self, path):
+        # Posting list + daftar n-gram, supaya segment baru bisa dihitung
+        # tanpa teks review (engine dari katalog)
+        os.makedirs(path, exist_ok=True)
+        sp.save_npz(os.path.join(path, POSTINGS_FILE), self.postings)
+        # Satu n-gram per baris (n-gram hasil split() tidak memuat newline)
+        with open(os.path.join(path, TERMS_FILE), "w", encoding="utf-8", newline="\n") as f:
+            f.write("\n".join(self.terms))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"max_ngram": self.max_ngram, "prefix": self.prefix}, f)
+
+    @classmethod
+    def load(cls, path, segment_keywords=None):
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(path, TERMS_FILE), encoding="utf-8", newline="\n") as f:
+            text = f.read()
+        terms = text.split("\n") if text else []
+        postings = sp.load_npz(os.path.join(path, POSTINGS_FILE)).tocsc()
+        matcher = cls.__new__(cls)
+        matcher._setup(terms, postings, meta["max_ngram"], meta["prefix"], segment_keywords)
+        return matcher
+
+    # ---------- keyword ----------
+    def add_keyword(self, keyword):
+        k = self.keyword_index.get(keyword)
+        if k is not None:
+            return k
+
+        cols = []
+        for form in keyword_forms(keyword):
+            if form.count(" ") >= self.max_ngram:
+                raise ValueError(f"keyword lebih dari {self.max_ngram} kata: {keyword!r}")
+            lo = bisect.bisect_left(self.terms, form)
+            if self.prefix:
+                hi = bisect.bisect_left(self.terms, form + "\uffff")
+                cols.extend(range(lo, hi))
+            elif lo < len(self.terms) and self.terms[lo] == form:
+                cols.append(lo)
+
+        # Dokumen yang memuat salah satu bentuk keyword
+        if cols:
+            docs = np.unique(self.postings[:, cols].indices)
+        else:
+            docs = np.empty(0, dtype=np.int64)
+
+        k = len(self.keywords)
+        self.keywords.append(keyword)
+        self.keyword_index[keyword] = k
+        self._keyword_hits.append(docs)
+        self._hits = None
+        return k
+
+    @property
+    def hits(self):
+        # Matriks biner sparse (dokumen x keyword), dibangun ulang hanya
+        # setelah ada keyword baru
+        if self._hits is None:
+            indices = (np.concatenate(self._keyword_hits) if self._keyword_hits
+                       else np.empty(0, dtype=np.int64))
+            indptr = np.concatenate([[0], np.cumsum([len(d) for d in self._keyword_hits])])
+            self._hits = sp.csc_matrix(
+                (np.ones(len(indices), dtype=np.float64), indices, indptr),
+                shape=(self.n_docs, len(self.keywords))
+            ).tocsr()
+        return self._hits
+
+    # ---------- segment ----------
+    def add_segment(self, name, keywords):
+        self.segments[name] = [self.add_keyword(k) for k in keywords]
+        return self.segment_scores(name)
+
+    def segment_counts(self, name):
+        # Jumlah keyword segment yang muncul di setiap dokumen
+        ids = self.segments.get(name)
+        if not ids:
+            return np.zeros(self.n_docs, dtype=np.float64)
+        return np.asarray(self.hits[:, ids].sum(axis=1), dtype=np.float64).ravel()
+
+    def segment_scores(self, name):
+        # Sama dengan recommend(): jumlah keyword yang muncul / jumlah keyword
+        ids = self.segments.get(name)
+        if not ids:
+            return np.zeros(self.n_docs, dtype=np.float64)
+        return self.segment_counts(name) / (len(ids) + 1e-9)
+
+    def segment_matrix(self, names=None):
+        names = list(self.segments) if names is None else list(names)
+        matrix = np.zeros((self.n_docs, len(names)), dtype=np.float64)
+        for j, name in enumerate(names):
+            matrix[:, j] = self.segment_scores(name)
+        return matrix
+
+    def stats(self):
+        return {
+            "docs": self.n_docs,
+            "ngrams": len(self.terms),
+            "keywords": len(self.keywords),
+            "segments": len(self.segments),
+            "postings_nnz": int(self.postings.nnz),
+        }
+
+
+# =========================
+# CACHE UNTUK recommend() FUNGSIONAL
+# =========================
+_cache = {}
+CACHE_SIZE = 2
+
+
+def matcher_for(docs, segment_keywords):
+    # recommend() / main.recommend() tidak menyimpan state: matcher dibangun
+    # sekali per korpus (hash tuple dokumen, hash string di-cache Python)
+    docs = tuple(docs)
+    key = (len(docs), hash(docs), id(segment_keywords))
+    matcher = _cache.get(key)
+    if matcher is None:
+        if len(_cache) >= CACHE_SIZE:
+            _cache.pop(next(iter(_cache)))
+        matcher = _cache[key] = KeywordMatcher(docs, segment_keywords)
+    return matcher
@@ -0,0 +1,87 @@
+import os
+import json
+import numpy as np
+
+# =========================
+# PATH
+# =========================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+PREDICTOR_PATH = os.path.join(MODELS_DIR, "kmodes_predictor.npz")
+
+
+# =========================
+# PREDICTOR
+# =========================
+class KModesPredictor:
+    # Pengganti ringan KModes.predict untuk serving: hanya centroid (int
+    # kecil) + mapping jawaban -> kode. Tidak butuh library kmodes/pickle.
+
+    def __init__(self, centroids, columns, categories):
+        self.centroids = np.asarray(centroids, dtype=np.int16)
+        self.columns = list(columns)
+        self.categories = [list(c) for c in categories]
+        self.value_to_code = [
+            {value: code for code, value in enumerate(cats)}
+            for cats in self.categories
+        ]
+
+    @classmethod
+    def from_kmodes(cls, km, category_mappings):
+        # category_mappings: {kolom: {kode: jawaban}} dari load_data()
+        columns = list(category_mappings)
+        categories = [
+            [mapping[code] for code in sorted(mapping)]
+            for mapping in category_mappings.values()
+        ]
+        return cls(km.cluster_centroids_, columns, categories)
+
+    # ---------- persist ----------
+    def save(self, path=PREDICTOR_PATH):
+        meta = json.dumps({"columns": self.columns, "categories": self.categories})
+        np.savez(path, centroids=self.centroids, meta=np.array(meta))
+        return path
+
+    @classmethod
+    def load(cls, path=PREDICTOR_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(data["centroids"], meta["columns"], meta["categories"])
+
+    # ---------- encode ----------
+    def encode(self, answers):
+        # answers: dict {kolom: jawaban} atau list jawaban sesuai urutan kolom.
+        # Jawaban yang tidak dikenal -> -1 (tidak cocok dengan centroid mana pun)
+        if isinstance(answers, dict):
+            answers = [answers[col] for col in self.columns]
+        return np.array(
+            [m.get(v, -1) for m, v in zip(self.value_to_code, answers)],
+            dtype=np.int16
+        )
+
+    # ---------- predict ----------
+    def predict(self, X):
+        # Jarak Hamming ke setiap centroid lalu argmin; argmin mengambil
+        # indeks terkecil saat seri, sama dengan KModes.predict
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X[None, :]
+        dist = (X[:, None, :] != self.centroids[None, :, :]).sum(axis=2)
+        return dist.argmin(axis=1)
+
+    def predict_one(self, answers):
+        codes = self.encode(answers)
+        dist = (codes != self.centroids).sum(axis=1)
+        return int(dist.argmin())
+
+
+def export_predictor(km, category_mappings, path=PREDICTOR_PATH):
+    return KModesPredictor.from_kmodes(km, category_mappings).save(path)
+
+
+if __name__ == "__main__":
+    import joblib
+
+    km = joblib.load(os.path.join(MODELS_DIR, "kmodes_model.pkl"))
+    category_mappings = joblib.load(os.path.join(MODELS_DIR, "category_mappings.pkl"))
+    print(f"Predictor disimpan ke {export_predictor(km, category_mappings)}")
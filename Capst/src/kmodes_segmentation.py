@@ -1,8 +1,12 @@
 import pandas as pd
 import joblib
-import matplotlib.pyplot as plt
-from kmodes.kmodes import KModes
-from sklearn.metrics import silhouette_score, davies_bouldin_score
+
+try:
+    from src.model_selection import run_sweep, summarize, select_model, write_report
+    from src.kmodes_predictor import export_predictor
+except ModuleNotFoundError:
+    from model_selection import run_sweep, summarize, select_model, write_report
+    from kmodes_predictor import export_predictor
 
 
 def normalize_category(text):
@@ -53,38 +57,6 @@ def load_data():
 
     return df_sel, encoded
 
-def evaluate_cost(encoded, k_range=range(2, 9)):
-    costs = []
-
-    for k in k_range:
-        km = KModes(n_clusters=k, init='Huang', n_init=10, random_state=42)
-        km.fit(encoded)
-        costs.append(km.cost_)
-
-    plt.figure(figsize=(7,4))
-    plt.plot(k_range, costs, marker='o')
-    plt.xlabel("Jumlah Cluster (K)")
-    plt.ylabel("Cost")
-    plt.title("Elbow Method K-Modes")
-    plt.grid()
-    plt.show()
-
-
-def train_kmodes(encoded, k=4):
-    km = KModes(n_clusters=k, init='Huang', n_init=20, random_state=42)
-    labels = km.fit_predict(encoded)
-
-    sil = silhouette_score(encoded, labels, metric='hamming')
-    dbi = davies_bouldin_score(encoded, labels)
-
-    print(f"Silhouette Score (Hamming): {sil:.4f}")
-    print(f"Davies-Bouldin Index: {dbi:.4f}")
-    print(f"K-Modes Cost: {km.cost_:.2f}")
-
-    joblib.dump(km, "models/kmodes_model.pkl")
-
-    return labels, km
-
 def profile_clusters(df_sel, labels):
     df_clustered = df_sel.copy()
     df_clustered['cluster'] = labels
@@ -97,14 +69,28 @@ def profile_clusters(df_sel, labels):
             print(f"\n{col}")
             print(cluster_data[col].value_counts().head(3))
 
+def select_final_model(encoded, k=4):
+    # Grid (k, seed) paralel + cache di models/sweep; model final diambil
+    # dari hasil sweep, tidak di-train ulang
+    results = run_sweep(encoded)
+    print(summarize(results)[["k", "seed", "cost", "silhouette", "davies_bouldin"]])
+    print(f"Report: {write_report(results)}")
+
+    km, row = select_model(results, k=k)
+    print(f"Silhouette Score (Hamming): {row['silhouette']:.4f}")
+    print(f"Davies-Bouldin Index: {row['davies_bouldin']:.4f}")
+    print(f"K-Modes Cost: {row['cost']:.2f}")
+
+    joblib.dump(km, "models/kmodes_model.pkl")
+    export_predictor(km, joblib.load("models/category_mappings.pkl"), "models/kmodes_predictor.npz")
+
+    return km.labels_, km
+
 if __name__ == "__main__":
     df_sel, encoded = load_data()
 
-    # Elbow Method
-    evaluate_cost(encoded)
-
-    # Train Final Model
-    labels, km = train_kmodes(encoded, k=4)
+    # Elbow Method + Final Model (sweep)
+    labels, km = select_final_model(encoded, k=4)
 
     # Profiling Cluster
     profile_clusters(df_sel, labels)
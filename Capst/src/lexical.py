@@ -0,0 +1,105 @@
+import numpy as np
+from sklearn.preprocessing import normalize
+
+
+# =========================
+# PRUNING VOCABULARY
+# =========================
+def prune_columns(tfidf, tfidf_matrix, min_df=1, max_df=1.0, max_ngram=None):
+    # Kolom (term) yang dipertahankan: df dalam [min_df, max_df] dan
+    # jumlah kata <= max_ngram. min_df/max_df: int = jumlah dokumen,
+    # float = proporsi dokumen (seperti TfidfVectorizer)
+    n_docs = tfidf_matrix.shape[0]
+    df = np.diff(tfidf_matrix.tocsc().indptr)
+
+    lo = min_df if isinstance(min_df, (int, np.integer)) else int(np.ceil(min_df * n_docs))
+    hi = max_df if isinstance(max_df, (int, np.integer)) else int(np.floor(max_df * n_docs))
+    keep = (df >= lo) & (df <= hi)
+
+    if max_ngram is not None:
+        terms = tfidf.get_feature_names_out()
+        order = np.fromiter((t.count(" ") + 1 for t in terms), dtype=np.int64, count=len(terms))
+        keep &= order <= max_ngram
+
+    return np.flatnonzero(keep)
+
+
+# =========================
+# LEXICAL SCORER
+# =========================
+class LexicalScorer:
+    # Matriks TF-IDF dinormalisasi L2 sekali, lalu disimpan transpose
+    # (term -> dokumen, CSR). Skor query = q @ term_docs: hanya baris term
+    # yang muncul di query yang disentuh, jadi biaya mengikuti panjang
+    # query + posting list term tersebut, bukan jumlah dokumen.
+
+    def __init__(self, tfidf, tfidf_matrix, min_df=1, max_df=1.0, max_ngram=None):
+        self.tfidf = tfidf
+        matrix = tfidf_matrix.tocsr()
+        n_terms = matrix.shape[1]
+
+        kept = prune_columns(tfidf, matrix, min_df, max_df, max_ngram)
+        self.pruned = len(kept) < n_terms
+        # Kolom vocabulary asli -> kolom baru (-1 = dibuang)
+        self.column_map = np.full(n_terms, -1, dtype=np.int64)
+        self.column_map[kept] = np.arange(len(kept))
+        self.kept = kept
+
+        if self.pruned:
+            matrix = matrix[:, kept]
+        self.doc_terms = normalize(matrix, copy=True).tocsr()
+        self.term_docs = self.doc_terms.T.tocsr()
+        self.term_docs.sort_indices()
+
+    @property
+    def n_docs(self):
+        return self.term_docs.shape[1]
+
+    @property
+    def n_terms(self):
+        return self.term_docs.shape[0]
+
+    # ---------- query ----------
+    def transform(self, texts):
+        q = self.tfidf.transform(texts).tocsr()
+        if self.pruned:
+            q = q[:, self.kept]
+        return normalize(q).tocsr()
+
+    def score_sparse(self, q):
+        # (m, n_docs) CSR: hanya dokumen yang berbagi term dengan query
+        return (q @ self.term_docs).tocsr()
+
+    def score(self, q):
+        # Skor dense (m, n_docs) untuk digabung dengan skor SBERT
+        m = q.shape[0]
+        out = np.zeros((m, self.n_docs), dtype=np.float64)
+        hits = self.score_sparse(q)
+        rows = np.repeat(np.arange(m), np.diff(hits.indptr))
+        out[rows, hits.indices] = hits.data
+        return out
+
+    def score_one(self, q):
+        return self.score(q)[0]
+
+    def score_rows(self, q, ids):
+        # Skor satu query hanya untuk dokumen `ids` (rerank kandidat ANN)
+        hits = self.score_sparse(q[:1])
+        hits.sort_indices()
+        out = np.zeros(len(ids), dtype=np.float64)
+        if hits.nnz:
+            pos = np.minimum(np.searchsorted(hits.indices, ids), hits.nnz - 1)
+            match = hits.indices[pos] == ids
+            out[match] = hits.data[pos[match]]
+        return out
+
+    # ---------- info ----------
+    def stats(self):
+        return {
+            "docs": self.n_docs,
+            "terms": self.n_terms,
+            "terms_before_pruning": len(self.column_map),
+            "nnz": int(self.term_docs.nnz),
+            "bytes": int(self.term_docs.data.nbytes + self.term_docs.indices.nbytes
+                         + self.term_docs.indptr.nbytes),
+        }
@@ -1,9 +1,11 @@
 from recommender import build_recommender, SEGMENT_KEYWORDS
+from keyword_matcher import KeywordMatcher
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
 # Build recommender components
 df, tfidf, tfidf_matrix, sbert, embeddings = build_recommender()
+keyword_matcher = KeywordMatcher(df['clean_review'], SEGMENT_KEYWORDS)
 
 def recommend(user_text, segment, lokasi=None, top_k=5,
               alpha=0.4, beta=0.4, gamma=0.2, delta=0.1):
@@ -22,10 +24,7 @@ def recommend(user_text, segment, lokasi=None, top_k=5,
     )
 
     # ===== Segment Keyword Boost (INI YANG KURANG SEBELUMNYA) =====
-    seg_keywords = SEGMENT_KEYWORDS.get(segment, [])
-    seg_match = df['clean_review'].apply(
-        lambda x: int(any(k in x for k in seg_keywords))
-    )
+    seg_match = (keyword_matcher.segment_counts(segment) > 0).astype(int)
 
     # ===== Hybrid Score (IDENTIK NOTEBOOK) =====
     df['score'] = (
@@ -0,0 +1,166 @@
+import os
+import json
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import joblib
+import numpy as np
+import pandas as pd
+from kmodes.kmodes import KModes
+from sklearn.metrics import silhouette_score, davies_bouldin_score
+
+# =========================
+# PATH
+# =========================
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SWEEP_DIR = os.path.join(BASE_DIR, "models", "sweep")
+REPORT_DIR = os.path.join(BASE_DIR, "models", "report")
+
+METRIC_COLUMNS = ["k", "seed", "n_init", "cost", "silhouette", "davies_bouldin"]
+
+
+# =========================
+# CACHE KEY
+# =========================
+def data_hash(encoded):
+    values = np.ascontiguousarray(np.asarray(encoded, dtype=np.int64))
+    h = hashlib.sha256(values.tobytes())
+    h.update(json.dumps([list(values.shape), list(getattr(encoded, "columns", []))]).encode())
+    return h.hexdigest()[:16]
+
+
+def fit_path(cache_dir, key, k, seed, n_init):
+    return os.path.join(cache_dir, key, f"k{k}_seed{seed}_init{n_init}")
+
+
+# =========================
+# SATU FIT (DIJALANKAN DI WORKER)
+# =========================
+def fit_one(values, k, seed, n_init):
+    km = KModes(n_clusters=k, init='Huang', n_init=n_init, random_state=seed)
+    labels = km.fit_predict(values)
+
+    # Silhouette (hamming) + Davies-Bouldin; butuh minimal 2 cluster terisi
+    if len(np.unique(labels)) > 1:
+        sil = silhouette_score(values, labels, metric='hamming')
+        dbi = davies_bouldin_score(values, labels)
+    else:
+        sil, dbi = float("nan"), float("nan")
+
+    metrics = {
+        "k": k,
+        "seed": seed,
+        "n_init": n_init,
+        "cost": float(km.cost_),
+        "silhouette": float(sil),
+        "davies_bouldin": float(dbi),
+    }
+    return metrics, km
+
+
+def _save_fit(path, metrics, km):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(km, path + ".pkl")
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump(metrics, f)
+
+
+def _load_metrics(path):
+    if not (os.path.exists(path + ".json") and os.path.exists(path + ".pkl")):
+        return None
+    with open(path + ".json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# =========================
+# SWEEP
+# =========================
+def run_sweep(encoded, k_range=range(2, 9), seeds=(42,), n_init=20,
+              n_workers=None, cache_dir=SWEEP_DIR):
+    # Grid (k, seed) dijalankan paralel; setiap fit + metriknya disimpan di
+    # cache_dir/<hash data>/ sehingga hanya sel grid yang belum ada yang
+    # dihitung ulang (mis. k atau seed baru, atau data kuesioner berubah)
+    values = np.asarray(encoded, dtype=np.int64)
+    key = data_hash(encoded)
+
+    rows, todo = [], []
+    for k, seed in itertools.product(k_range, seeds):
+        path = fit_path(cache_dir, key, k, seed, n_init)
+        metrics = _load_metrics(path)
+        if metrics is None:
+            todo.append((k, seed, path))
+        else:
+            rows.append(dict(metrics, path=path + ".pkl", cached=True))
+
+    def collect(job, result):
+        metrics, km = result
+        _save_fit(job[2], metrics, km)
+        rows.append(dict(metrics, path=job[2] + ".pkl", cached=False))
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(todo))
+    if n_workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = [pool.submit(fit_one, values, k, seed, n_init) for k, seed, _ in todo]
+                for job, fut in zip(todo, futures):
+                    collect(job, fut.result())
+            todo = []
+        except (OSError, BrokenProcessPool):
+            # Tanpa dukungan multiprocessing -> lanjut serial
+            todo = [job for job in todo if not os.path.exists(job[2] + ".json")]
+
+    for job in todo:
+        collect(job, fit_one(values, job[0], job[1], n_init))
+
+    results = pd.DataFrame(rows).sort_values(["k", "seed"]).reset_index(drop=True)
+    results.attrs["data_hash"] = key
+    return results
+
+
+def summarize(results):
+    # Seed terbaik (cost terendah) untuk setiap k
+    best = results.loc[results.groupby("k")["cost"].idxmin()]
+    return best.sort_values("k").reset_index(drop=True)
+
+
+def select_model(results, k=None, criterion="silhouette"):
+    best = summarize(results)
+    if k is not None:
+        row = best[best["k"] == k].iloc[0]
+    elif criterion == "davies_bouldin":
+        row = best.loc[best["davies_bouldin"].idxmin()]
+    else:
+        row = best.loc[best[criterion].idxmax()]
+    return joblib.load(row["path"]), row
+
+
+# =========================
+# REPORT (HEADLESS)
+# =========================
+def write_report(results, out_dir=REPORT_DIR):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(out_dir, exist_ok=True)
+    results[METRIC_COLUMNS].to_csv(os.path.join(out_dir, "kmodes_sweep.csv"), index=False)
+
+    best = summarize(results)
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    for ax, col, title in zip(
+        axes,
+        ["cost", "silhouette", "davies_bouldin"],
+        ["Elbow Method K-Modes", "Silhouette (Hamming)", "Davies-Bouldin Index"]
+    ):
+        ax.plot(best["k"], best[col], marker='o')
+        ax.set_xlabel("Jumlah Cluster (K)")
+        ax.set_title(title)
+        ax.grid()
+    fig.tight_layout()
+    png = os.path.join(out_dir, "kmodes_sweep.png")
+    fig.savefig(png)
+    plt.close(fig)
+
+    return png
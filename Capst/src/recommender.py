@@ -1,9 +1,5 @@
 import os
-import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
 
 # =========================
 # PATH AMAN (DEPLOY SAFE)
@@ -22,10 +18,27 @@ CSV_PATH = os.path.join(
 # =========================
 try:
     # Saat dijalankan via streamlit / deploy
-    from src.text_preprocessing import preprocess
+    from src.text_preprocessing import (
+        preprocess_parallel, PREPROCESS_CONFIG, DEFAULT_CHUNK_SIZE
+    )
+    from src import artifact_store
+    from src.data_loader import iter_review_chunks, aggregate_reviews, new_stats
+    from src.embedding import embed_shops, encoder_name, chunk_budget
+    from src import instrumentation
+    from src.keyword_matcher import matcher_for
 except ModuleNotFoundError:
     # Saat dijalankan langsung (python src/recommender.py)
-    from text_preprocessing import preprocess
+    from text_preprocessing import (
+        preprocess_parallel, PREPROCESS_CONFIG, DEFAULT_CHUNK_SIZE
+    )
+    import artifact_store
+    from data_loader import iter_review_chunks, aggregate_reviews, new_stats
+    from embedding import embed_shops, encoder_name, chunk_budget
+    import instrumentation
+    from keyword_matcher import matcher_for
+
+SBERT_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+TFIDF_PARAMS = {"max_features": 5000, "ngram_range": (1, 2)}
 
 
 
@@ -54,39 +67,111 @@ SEGMENT_KEYWORDS = {
 # =========================
 # BUILD RECOMMENDER
 # =========================
-def build_recommender(csv_path=CSV_PATH):
-    df = pd.read_csv(
-        csv_path,
-        sep=";",
-        quotechar='"',
-        on_bad_lines="skip",
-        engine="python"
-    )
-
-    df.columns = df.columns.str.strip()
-    df = df.dropna(subset=["review_text", "name"]).reset_index(drop=True)
-
-    df["clean_review"] = df["review_text"].apply(preprocess)
-
-    df_agg = df.groupby("name").agg({
-        "clean_review": " ".join,
-        "rating": "mean",
-        "area": "first",
-        "address": "first"
-    }).reset_index()
-
-    tfidf = TfidfVectorizer(max_features=5000, ngram_range=(1, 2))
-    tfidf_matrix = tfidf.fit_transform(df_agg["clean_review"])
+def load_sbert(model_name=SBERT_MODEL_NAME):
+    # Import torch / sentence-transformers baru saat model benar-benar dibutuhkan
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def build_artifacts(csv_path=CSV_PATH, cache_dir=artifact_store.ARTIFACT_DIR,
+                    use_cache=True, n_workers=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE, encoder=None,
+                    embedding_mode="concat", chunk_tokens=None, pooling="mean",
+                    load_df=True, keep_parts=False):
+    # load_df=False: saat cache hit, df_agg tidak dimuat (df=None)
+    # keep_parts=True: saat cache miss, review_parts (list clean_review per
+    # toko) ikut dikembalikan untuk index per review; None saat cache hit
+    # embedding_mode:
+    #   "concat" -> encode satu dokumen gabungan per toko (terpotong di
+    #               max_seq_length model)
+    #   "chunk"  -> review per toko dipecah jadi chunk, di-encode lalu
+    #               di-pool (mean/max); matriks chunk ikut disimpan.
+    #               chunk_tokens=None: budget = max_seq_length encoder,
+    #               dihitung dengan tokenizer model
+    with instrumentation.request("build_artifacts"):
+        with instrumentation.stage("build.load_model"):
+            sbert = load_sbert() if encoder is None else encoder
+        model_name = SBERT_MODEL_NAME if encoder is None else encoder_name(encoder)
+
+        extra = dict(TFIDF_PARAMS, embedding_mode=embedding_mode)
+        if embedding_mode == "chunk":
+            if chunk_tokens is None:
+                chunk_tokens = chunk_budget(sbert)
+            extra.update(chunk_tokens=chunk_tokens, pooling=pooling)
+
+        key = path = None
+        if use_cache:
+            key = artifact_store.artifact_key(
+                csv_path, PREPROCESS_CONFIG, model_name, extra=extra
+            )
+            path = artifact_store.artifact_path(key, cache_dir)
+            with instrumentation.stage("build.cache_load"):
+                cached = artifact_store.load_artifacts(path, load_df=load_df)
+            if cached is not None:
+                instrumentation.count("build.cache_hit")
+                df_agg, tfidf, tfidf_matrix, embeddings = cached
+                chunks = artifact_store.load_extras(path, ("chunk_embeddings", "chunk_offsets"))
+                return dict(
+                    df=df_agg, tfidf=tfidf, tfidf_matrix=tfidf_matrix, sbert=sbert,
+                    embeddings=embeddings, key=key, path=path, review_parts=None, **chunks
+                )
+
+        # CSV dibaca per blok (parser C, fallback python per blok) dan langsung
+        # di-preprocess + diagregasi per toko; n_reviews dipakai add_reviews()
+        load_stats = new_stats()
+        with instrumentation.stage("build.load_preprocess"):
+            df_agg = aggregate_reviews(
+                iter_review_chunks(csv_path, stats=load_stats),
+                lambda texts: preprocess_parallel(
+                    texts, n_workers=n_workers, chunk_size=chunk_size
+                ),
+                keep_parts=keep_parts or embedding_mode == "chunk"
+            )
+        instrumentation.count("build.reviews", load_stats["rows"])
+        # Tidak ikut disimpan di df_agg.pkl
+        review_parts = df_agg.pop("review_parts").tolist() if "review_parts" in df_agg else None
+
+        with instrumentation.stage("build.tfidf_fit"):
+            # sklearn di-import saat dipakai (bukan saat import modul)
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+            tfidf_matrix = tfidf.fit_transform(df_agg["clean_review"])
+
+        extras = {"chunk_embeddings": None, "chunk_offsets": None}
+        with instrumentation.stage("build.embed"):
+            if embedding_mode == "chunk":
+                embeddings, chunk_emb, offsets = embed_shops(
+                    review_parts, sbert,
+                    max_tokens=chunk_tokens, pooling=pooling
+                )
+                extras = {"chunk_embeddings": chunk_emb, "chunk_offsets": offsets}
+            else:
+                embeddings = sbert.encode(
+                    df_agg["clean_review"].tolist(),
+                    show_progress_bar=False
+                )
+
+        if use_cache:
+            with instrumentation.stage("build.save"):
+                artifact_store.save_artifacts(
+                    path, df_agg, tfidf, tfidf_matrix, embeddings,
+                    meta={"key": key, "csv_path": os.path.abspath(csv_path),
+                          "model": model_name, "n_shops": len(df_agg),
+                          "embedding_mode": embedding_mode,
+                          "load_stats": load_stats},
+                    extras={k: v for k, v in extras.items() if v is not None}
+                )
+
+        return dict(
+            df=df_agg, tfidf=tfidf, tfidf_matrix=tfidf_matrix, sbert=sbert,
+            embeddings=embeddings, key=key, path=path,
+            review_parts=review_parts if keep_parts else None, **extras
+        )
 
-    sbert = SentenceTransformer(
-        "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-    )
-    embeddings = sbert.encode(
-        df_agg["clean_review"].tolist(),
-        show_progress_bar=False
-    )
 
-    return df_agg, tfidf, tfidf_matrix, sbert, embeddings
+def build_recommender(csv_path=CSV_PATH, **kwargs):
+    a = build_artifacts(csv_path, **kwargs)
+    return a["df"], a["tfidf"], a["tfidf_matrix"], a["sbert"], a["embeddings"]
 
 
 # =========================
@@ -107,23 +192,48 @@ def recommend(
     delta=0.20,
     top_k=5
 ):
+    with instrumentation.request("recommend_legacy"):
+        return _recommend(
+            df, tfidf, tfidf_matrix, sbert, embeddings, user_text, segment,
+            lokasi, alpha, beta, gamma, delta, top_k
+        )
+
+
+def _recommend(df, tfidf, tfidf_matrix, sbert, embeddings, user_text, segment,
+               lokasi, alpha, beta, gamma, delta, top_k):
     df = df.copy()
 
+    # Skor segment dari matcher keyword yang dibangun sekali per korpus
+    seg_kw = SEGMENT_KEYWORDS.get(segment, [])
+    if seg_kw:
+        with instrumentation.stage("segment_match"):
+            seg_match = matcher_for(df["clean_review"], SEGMENT_KEYWORDS).segment_scores(segment)
+    else:
+        seg_match = np.zeros(len(df))
+
     if lokasi:
-        df = df[df["area"].str.contains(lokasi, case=False, na=False)]
+        with instrumentation.stage("area_filter"):
+            df = df[df["area"].str.contains(lokasi, case=False, na=False)]
         if df.empty:
             return df
 
         idx = df.index
         tfidf_matrix = tfidf_matrix[idx]
         embeddings = embeddings[idx]
+        seg_match = seg_match[idx]
 
     if user_text.strip():
-        user_emb = sbert.encode([user_text])
-        sim_sbert = cosine_similarity(user_emb, embeddings).flatten()
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        with instrumentation.stage("sbert_encode"):
+            user_emb = sbert.encode([user_text])
+        with instrumentation.stage("vector_score"):
+            sim_sbert = cosine_similarity(user_emb, embeddings).flatten()
 
-        user_tf = tfidf.transform([user_text])
-        sim_tfidf = cosine_similarity(user_tf, tfidf_matrix).flatten()
+        with instrumentation.stage("tfidf_transform"):
+            user_tf = tfidf.transform([user_text])
+        with instrumentation.stage("tfidf_score"):
+            sim_tfidf = cosine_similarity(user_tf, tfidf_matrix).flatten()
     else:
         sim_sbert = np.zeros(len(df))
         sim_tfidf = np.zeros(len(df))
@@ -132,15 +242,6 @@ def recommend(
         df["rating"].max() - df["rating"].min() + 1e-9
     )
 
-    seg_kw = SEGMENT_KEYWORDS.get(segment, [])
-    if seg_kw:
-        seg_match = df["clean_review"].apply(
-            lambda x: sum(1 for k in seg_kw if k in x)
-        )
-        seg_match = seg_match / (len(seg_kw) + 1e-9)
-    else:
-        seg_match = np.zeros(len(df))
-
     df["score"] = (
         alpha * sim_sbert +
         beta * sim_tfidf +
@@ -148,4 +249,5 @@ def recommend(
         delta * seg_match
     )
 
-    return df.sort_values("score", ascending=False).head(top_k)
+    with instrumentation.stage("rank"):
+        return df.sort_values("score", ascending=False).head(top_k)
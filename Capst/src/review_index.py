@@ -0,0 +1,231 @@
+import os
+import json
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+try:
+    from src.recommender import CSV_PATH, TFIDF_PARAMS
+    from src.text_preprocessing import preprocess_parallel, DEFAULT_CHUNK_SIZE
+    from src.data_loader import iter_review_chunks, aggregate_reviews
+    from src.embedding import encode_sorted, pool_chunks
+    from src.vector_index import normalize_rows, top_k_rows
+    from src.lexical import LexicalScorer
+    from src.artifact_store import replace_atomic, META_FILE
+except ModuleNotFoundError:
+    from recommender import CSV_PATH, TFIDF_PARAMS
+    from text_preprocessing import preprocess_parallel, DEFAULT_CHUNK_SIZE
+    from data_loader import iter_review_chunks, aggregate_reviews
+    from embedding import encode_sorted, pool_chunks
+    from vector_index import normalize_rows, top_k_rows
+    from lexical import LexicalScorer
+    from artifact_store import replace_atomic, META_FILE
+
+REVIEW_INDEX_DIR = "reviews"
+AGG_MODES = ("max", "mean", "top_m")
+
+
+# =========================
+# AGREGASI REVIEW -> TOKO
+# =========================
+def aggregate_scores(scores, offsets, mode="max", top_m=3):
+    # scores: (m, n_review) dengan review terurut per toko;
+    # offsets[i]:offsets[i+1] = review milik toko i (setiap toko >= 1 review)
+    starts = offsets[:-1]
+    if mode == "max" or (mode == "top_m" and top_m == 1):
+        return np.maximum.reduceat(scores, starts, axis=1)
+
+    sizes = np.diff(offsets)
+    if mode == "mean":
+        return np.add.reduceat(scores, starts, axis=1) / sizes
+
+    if mode != "top_m":
+        raise ValueError(f"mode agregasi tidak dikenal: {mode}")
+
+    # Rata-rata top-m per toko: urutkan setiap baris per (toko, skor menurun),
+    # lalu hanya m posisi pertama di tiap toko yang dijumlahkan
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    order = np.lexsort((-scores, np.broadcast_to(group, scores.shape)), axis=-1)
+    ranked = np.take_along_axis(scores, order, axis=1)
+    rank = np.arange(scores.shape[1]) - offsets[group]
+    ranked = np.where(rank < top_m, ranked, 0.0)
+    return np.add.reduceat(ranked, starts, axis=1) / np.minimum(sizes, top_m)
+
+
+# =========================
+# REVIEW INDEX
+# =========================
+class ReviewIndex:
+    # Embedding SBERT dan TF-IDF per review (bukan per toko gabungan), terurut
+    # per toko. Skor query dihitung per review lalu diagregasi ke toko, jadi
+    # review pendek yang sangat cocok tidak tenggelam di dokumen toko panjang.
+
+    def __init__(self, review_emb, tfidf, review_tfidf, offsets,
+                 agg="max", top_m=3, normalized=False):
+        self.vectors = np.asarray(review_emb, dtype=np.float32) if normalized else normalize_rows(review_emb)
+        self.tfidf = tfidf
+        self.review_tfidf = review_tfidf.tocsr()
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if np.any(np.diff(self.offsets) <= 0):
+            raise ValueError("setiap toko harus punya minimal satu review")
+        # review -> baris toko
+        self.review_shop = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        self.agg = agg
+        self.top_m = top_m
+        self.lexical = LexicalScorer(tfidf, self.review_tfidf)
+
+    @property
+    def n_shops(self):
+        return len(self.offsets) - 1
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def aggregate(self, scores):
+        return aggregate_scores(scores, self.offsets, self.agg, self.top_m)
+
+    @classmethod
+    def build(cls, review_parts, encoder, agg="max", top_m=3, batch_size=64):
+        # review_parts: list (per toko, urutan baris df_agg) berisi clean_review
+        texts = [text for parts in review_parts for text in parts]
+        offsets = np.concatenate([[0], np.cumsum([len(p) for p in review_parts])])
+
+        tfidf = TfidfVectorizer(**TFIDF_PARAMS)
+        review_tfidf = tfidf.fit_transform(texts)
+        review_emb = normalize_rows(encode_sorted(encoder, texts, batch_size))
+        return cls(review_emb, tfidf, review_tfidf, offsets, agg, top_m, normalized=True)
+
+    # ---------- persist ----------
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "review_emb.npy"), self.vectors)
+        np.save(os.path.join(path, "offsets.npy"), self.offsets)
+        sp.save_npz(os.path.join(path, "review_tfidf.npz"), self.review_tfidf)
+        joblib.dump(self.tfidf, os.path.join(path, "tfidf.pkl"))
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"reviews": len(self), "shops": self.n_shops}, f)
+        return path
+
+    @classmethod
+    def load(cls, path, mmap=True, agg="max", top_m=3):
+        return cls(
+            np.load(os.path.join(path, "review_emb.npy"), mmap_mode="r" if mmap else None),
+            joblib.load(os.path.join(path, "tfidf.pkl")),
+            sp.load_npz(os.path.join(path, "review_tfidf.npz")),
+            np.load(os.path.join(path, "offsets.npy")),
+            agg, top_m, normalized=True
+        )
+
+    # ---------- adapter untuk RecommenderEngine ----------
+    def vector_index(self):
+        return ReviewVectorIndex(self)
+
+    def lexical_scorer(self):
+        return ReviewLexicalScorer(self)
+
+
+class ReviewVectorIndex:
+    # Interface vector_index: score_all -> (m, n_toko) hasil agregasi
+    kind = "review"
+    approximate = False
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return self.index.n_shops
+
+    @property
+    def vectors(self):
+        # Representasi toko = rata-rata embedding review (tidak dipakai scoring)
+        return normalize_rows(pool_chunks(self.index.vectors, self.index.offsets))
+
+    def score_all(self, queries):
+        return self.index.aggregate(normalize_rows(queries) @ self.index.vectors.T)
+
+    def search(self, queries, k):
+        return top_k_rows(self.score_all(queries), k)
+
+
+class ReviewLexicalScorer:
+    # Interface LexicalScorer untuk engine, skor TF-IDF per review diagregasi
+    def __init__(self, index):
+        self.index = index
+        self.doc_terms = index.lexical.doc_terms
+
+    def transform(self, texts):
+        return self.index.lexical.transform(texts)
+
+    def score(self, q):
+        index = self.index
+        if index.agg == "top_m" and index.top_m > 1:
+            return index.aggregate(index.lexical.score(q))
+
+        # max / mean langsung dari hit sparse (skor TF-IDF >= 0), tanpa
+        # matriks dense (m, n_review)
+        hits = index.lexical.score_sparse(q)
+        rows = np.repeat(np.arange(q.shape[0]), np.diff(hits.indptr))
+        cols = index.review_shop[hits.indices]
+        out = np.zeros((q.shape[0], index.n_shops), dtype=np.float64)
+        if index.agg == "mean":
+            np.add.at(out, (rows, cols), hits.data)
+            return out / np.diff(index.offsets)
+        np.maximum.at(out, (rows, cols), hits.data)
+        return out
+
+    def score_one(self, q):
+        return self.score(q[:1])[0]
+
+    def score_rows(self, q, ids):
+        return self.score_one(q)[ids]
+
+    def stats(self):
+        return dict(self.index.lexical.stats(), shops=self.index.n_shops)
+
+
+# =========================
+# BUILD + CACHE
+# =========================
+def build_review_index(csv_path=CSV_PATH, encoder=None, agg="max", top_m=3,
+                       n_workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Urutan toko sama dengan build_artifacts(): aggregate_reviews
+    # mengurutkan berdasarkan nama toko
+    df_agg = aggregate_reviews(
+        iter_review_chunks(csv_path),
+        lambda texts: preprocess_parallel(texts, n_workers=n_workers, chunk_size=chunk_size),
+        keep_parts=True
+    )
+    index = ReviewIndex.build(df_agg["review_parts"].tolist(), encoder, agg, top_m)
+    return index, df_agg["name"].tolist()
+
+
+def artifact_meta(artifact_dir):
+    try:
+        with open(os.path.join(artifact_dir, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def open_review_index(artifact_dir, csv_path=CSV_PATH, encoder=None, agg="max", top_m=3,
+                      n_workers=None, chunk_size=DEFAULT_CHUNK_SIZE, review_parts=None):
+    # Disimpan di <artifact>/reviews sehingga ikut ter-invalidasi bersama
+    # artifact toko (key yang sama). review_parts dari build_artifacts
+    # (keep_parts=True) dipakai langsung; CSV hanya dibaca ulang bila tidak ada
+    def build():
+        if review_parts is not None:
+            return ReviewIndex.build(review_parts, encoder, agg, top_m)
+        return build_review_index(csv_path, encoder, agg, top_m, n_workers, chunk_size)[0]
+
+    if artifact_dir is None:
+        return build()
+
+    path = os.path.join(artifact_dir, REVIEW_INDEX_DIR)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        if review_parts is None and artifact_meta(artifact_dir).get("incremental"):
+            # Artifact dari IncrementalRecommender.save(): review baru tidak
+            # ada di CSV, index dari CSV akan basi / tidak cocok
+            raise ValueError("index per review tidak tersedia untuk artifact incremental")
+        replace_atomic(path, build().save)
+    return ReviewIndex.load(path, agg=agg, top_m=top_m)
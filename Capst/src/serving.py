@@ -0,0 +1,363 @@
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    from src.engine import RecommenderEngine, DEFAULT_WEIGHTS
+    from src.kmodes_predictor import KModesPredictor, PREDICTOR_PATH
+    from src.recommender import SEGMENT_KEYWORDS
+    from src.api_client import RESULT_COLUMNS
+    from src import instrumentation
+except ModuleNotFoundError:
+    from engine import RecommenderEngine, DEFAULT_WEIGHTS
+    from kmodes_predictor import KModesPredictor, PREDICTOR_PATH
+    from recommender import SEGMENT_KEYWORDS
+    from api_client import RESULT_COLUMNS
+    import instrumentation
+
+# =========================
+# KONFIGURASI
+# =========================
+# Urutan cluster K-Modes -> nama segment (sama dengan streamlit_app.py /
+# simulate_system.py)
+SEGMENT_NAMES = list(SEGMENT_KEYWORDS)
+MAX_TOP_K = 50
+MAX_BODY_BYTES = 64 * 1024
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class PlainText(str):
+    # Respons non-JSON (format teks Prometheus untuk /metrics)
+    content_type = "text/plain; version=0.0.4"
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def to_records(df):
+    records = []
+    for row in df[RESULT_COLUMNS].itertuples(index=False):
+        rec = {}
+        for col, value in zip(RESULT_COLUMNS, row):
+            if isinstance(value, (float, np.floating)):
+                value = None if value != value else float(value)
+            rec[col] = value
+        records.append(rec)
+    return records
+
+
+# =========================
+# MICRO-BATCHING
+# =========================
+class MicroBatcher:
+    # Request yang datang bersamaan dikumpulkan sampai max_batch item atau
+    # max_wait_ms sejak item pertama, lalu fn(list item) dijalankan sekali di
+    # executor (satu forward pass encoder untuk seluruh batch). Event loop
+    # tidak pernah ikut menjalankan inference.
+
+    def __init__(self, fn, max_batch=32, max_wait_ms=5.0, executor=None):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.stats = {"batches": 0, "items": 0, "largest_batch": 0}
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item):
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, fut))
+        return await fut
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            getter = loop.create_task(self._queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+            if getter in done:
+                batch.append(getter.result())
+                continue
+            getter.cancel()
+            try:
+                # get() bisa saja selesai tepat saat dibatalkan
+                batch.append(await getter)
+            except asyncio.CancelledError:
+                pass
+            break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            self.stats["batches"] += 1
+            self.stats["items"] += len(items)
+            self.stats["largest_batch"] = max(self.stats["largest_batch"], len(items))
+
+            try:
+                results = await loop.run_in_executor(self.executor, self.fn, items)
+            except Exception as exc:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+
+# =========================
+# SERVICE
+# =========================
+class RecommenderService:
+    # Artifact, encoder, dan predictor dimuat sekali per proses; semua
+    # request /recommend melewati satu MicroBatcher
+
+    def __init__(self, engine, predictor, max_batch=32, max_wait_ms=5.0, n_threads=1):
+        self.engine = engine
+        self.predictor = predictor
+        self.executor = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix="recommend")
+        self.batcher = MicroBatcher(self._recommend_batch, max_batch, max_wait_ms, self.executor)
+        self.started = time.time()
+
+    @classmethod
+    def build(cls, predictor_path=PREDICTOR_PATH, engine_kwargs=None, **kwargs):
+        engine = RecommenderEngine.build(**(engine_kwargs or {}))
+        return cls(engine, KModesPredictor.load(predictor_path), **kwargs)
+
+    def _recommend_batch(self, queries):
+        return [to_records(df) for df in self.engine.recommend_batch(queries)]
+
+    # ---------- handler ----------
+    def segment(self, payload):
+        answers = payload.get("answers")
+        columns = self.predictor.columns
+        if isinstance(answers, dict):
+            missing = [col for col in columns if col not in answers]
+            if missing:
+                raise RequestError(400, f"jawaban tidak lengkap: {', '.join(missing)}")
+            answers = [answers[col] for col in columns]
+        elif not isinstance(answers, list):
+            raise RequestError(400, "answers wajib diisi (dict kolom -> jawaban)")
+        if len(answers) != len(columns):
+            raise RequestError(400, f"answers harus berisi {len(columns)} jawaban")
+
+        # Jawaban di luar pilihan kuesioner ditolak, bukan diam-diam
+        # di-encode -1 oleh predictor
+        unknown = []
+        for col, codes, value in zip(columns, self.predictor.value_to_code, answers):
+            try:
+                known = value in codes
+            except TypeError:
+                known = False
+            if not known:
+                unknown.append(col)
+        if unknown:
+            raise RequestError(400, f"jawaban tidak dikenal untuk: {', '.join(unknown)}")
+
+        cluster = self.predictor.predict_one(answers)
+        return {"cluster": cluster, "segment": SEGMENT_NAMES[cluster]}
+
+    async def recommend(self, payload):
+        segment, cluster = payload.get("segment"), None
+        if payload.get("answers") is not None:
+            seg = self.segment(payload)
+            segment, cluster = seg["segment"], seg["cluster"]
+
+        try:
+            top_k = min(int(payload.get("top_k", 5)), MAX_TOP_K)
+        except (TypeError, ValueError):
+            raise RequestError(400, "top_k harus bilangan bulat")
+
+        # Validasi di sini: satu request rusak tidak boleh menggagalkan batch
+        weights = payload.get("weights")
+        if weights is not None:
+            if isinstance(weights, dict):
+                weights = [weights.get(k, d) for k, d in zip(("alpha", "beta", "gamma", "delta"), DEFAULT_WEIGHTS)]
+            try:
+                weights = [float(w) for w in weights]
+            except (TypeError, ValueError):
+                weights = None
+            if weights is None or len(weights) != 4:
+                raise RequestError(400, "weights = [alpha, beta, gamma, delta]")
+
+        query = {
+            "user_text": str(payload.get("user_text", payload.get("text", "")) or ""),
+            "segment": segment,
+            "lokasi": payload.get("lokasi", payload.get("area")) or None,
+            "weights": weights,
+            "top_k": max(top_k, 1),
+        }
+        results = await self.batcher.submit(query)
+        return {"segment": segment, "cluster": cluster, "results": results}
+
+    def health(self):
+        return {
+            "status": "ok",
+            "shops": len(self.engine),
+            "artifact": getattr(self.engine, "artifact_key", None),
+            "uptime_s": round(time.time() - self.started, 1),
+            "batching": dict(self.batcher.stats),
+        }
+
+    async def dispatch(self, method, path, body):
+        routes = {"/recommend": "POST", "/segment": "POST", "/health": "GET", "/metrics": "GET"}
+        if path not in routes:
+            raise RequestError(404, f"path tidak dikenal: {path}")
+        if method != routes[path]:
+            raise RequestError(405, f"{path} hanya menerima {routes[path]}")
+
+        if path == "/health":
+            return self.health()
+        if path == "/metrics":
+            sink = instrumentation.find_sink(instrumentation.PrometheusSink)
+            if sink is None:
+                raise RequestError(404, "set RECOMMENDER_METRICS=prometheus untuk /metrics")
+            return PlainText(sink.render())
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise RequestError(400, "body harus JSON")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "body harus objek JSON")
+
+        if path == "/segment":
+            return self.segment(payload)
+        return await self.recommend(payload)
+
+    # ---------- HTTP/1.1 minimal ----------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                try:
+                    if length > MAX_BODY_BYTES:
+                        raise RequestError(413, "body terlalu besar")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = 200, await self.dispatch(method, target.split("?")[0], body)
+                except RequestError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {"error": repr(exc)}
+
+                keep_alive = (
+                    version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                    and status != 413
+                )
+                if isinstance(payload, PlainText):
+                    content_type, data = payload.content_type, payload.encode("utf-8")
+                else:
+                    content_type, data = "application/json", json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8000, ready=None):
+        self.batcher.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.executor.shutdown(wait=False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=1)
+    # int8 = ringkas & cepat; float16 hemat memori tapi scoring ~15x float32
+    parser.add_argument("--embedding-dtype", choices=["float16", "int8"], default=None)
+    # ivf: kandidat SBERT dari IVFIndex tersimpan, rerank hybrid pada kandidat
+    parser.add_argument("--vector-index", choices=["exact", "ivf"], default="exact")
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--n-probe", type=int, default=8)
+    # Default: metadata toko dari katalog Arrow (mmap), tanpa teks review
+    parser.add_argument("--catalogue", action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args()
+
+    instrumentation.configure_from_env()
+    service = RecommenderService.build(
+        engine_kwargs={
+            "embedding_dtype": args.embedding_dtype, "catalogue": args.catalogue,
+            "vector_index": args.vector_index, "n_lists": args.n_lists, "n_probe": args.n_probe,
+        },
+        max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, n_threads=args.threads
+    )
+    print(f"Recommender API di http://{args.host}:{args.port} ({len(service.engine)} toko)")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import joblib
-import pandas as pd
 
 from recommender import build_recommender
 from main import recommend
+from kmodes_predictor import KModesPredictor
 
 segment_mapping = {
     0: "Instagrammable & Aesthetic",
@@ -11,7 +11,7 @@ segment_mapping = {
     3: "Productive Work / Study"
 }
 
-km = joblib.load("models/kmodes_model.pkl")
+km = KModesPredictor.load("models/kmodes_predictor.npz")
 category_mappings = joblib.load("models/category_mappings.pkl")
 
 def ask_question(question, options):
@@ -33,17 +33,7 @@ def get_user_input():
     return user_input
 
 def predict_cluster(user_input):
-    encoded = []
-
-    for col, categories in category_mappings.items():
-        value = user_input[col]
-        code = list(categories.values()).index(value)
-        encoded.append(code)
-
-    user_df = pd.DataFrame([encoded], columns=category_mappings.keys())
-    cluster = km.predict(user_df)[0]
-
-    return cluster
+    return km.predict_one(user_input)
 
 def simulate():
     print("\n===== SIMULASI SISTEM REKOMENDASI COFFEE SHOP =====")
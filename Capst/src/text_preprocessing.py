@@ -1,33 +1,256 @@
+import os
 import re
-from langdetect import detect
-from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
-import nltk
-nltk.download('punkt')
-nltk.download('punkt_tab')
-nltk.download('stopwords')
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-
-stemmer = StemmerFactory().create_stemmer()
-stop_id = set(stopwords.words('indonesian'))
-stop_en = set(stopwords.words('english'))
-all_stop = stop_id.union(stop_en)
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-def preprocess(text):
-    text = str(text).lower()
-    text = re.sub(r'http\S+|www\S+', ' ', text)
-    text = re.sub(r'[^a-z\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+try:
+    from src import instrumentation
+except ModuleNotFoundError:
+    import instrumentation
+
+# =========================
+# RESOURCE (LAZY)
+# =========================
+# NLTK, Sastrawi dan langdetect baru dimuat saat pertama dipakai, supaya
+# import modul ini (dan recommender / streamlit_app) tidak memicu download
+# atau pembuatan stemmer. Set NLTK_OFFLINE=1 agar gagal cepat ketika data
+# NLTK belum tersedia, alih-alih mencoba download.
+NLTK_OFFLINE = os.environ.get("NLTK_OFFLINE", "").lower() in ("1", "true", "yes")
+
+NLTK_RESOURCES = {"stopwords": "corpora/stopwords"}
+
+
+def ensure_nltk_data(offline=None):
+    import nltk
+
+    offline = NLTK_OFFLINE if offline is None else offline
+
+    for name, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if offline:
+                raise LookupError(
+                    f"NLTK resource '{name}' tidak ditemukan dan NLTK_OFFLINE aktif. "
+                    f"Jalankan nltk.download('{name}') saat build."
+                )
+            if not nltk.download(name, quiet=True):
+                raise LookupError(f"Gagal mengunduh NLTK resource '{name}'")
+
+
+def create_stemmer():
+    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+    from Sastrawi.Stemmer.Stemmer import Stemmer
+    from Sastrawi.Dictionary.ArrayDictionary import ArrayDictionary
+
+    # ArrayDictionary.contains() mencari di list ~30rb kata dasar untuk
+    # setiap percobaan prefix/suffix; set memberi hasil sama dalam O(1).
+    # Cache hasil stem ditangani stem_token() di bawah.
+    dictionary = ArrayDictionary(StemmerFactory().get_words())
+    dictionary.words = set(dictionary.words)
+    return Stemmer(dictionary)
+
+
+@lru_cache(maxsize=None)
+def get_stemmer():
+    return create_stemmer()
+
+
+@lru_cache(maxsize=None)
+def get_stopwords():
+    ensure_nltk_data()
+    from nltk.corpus import stopwords
+
+    return frozenset(stopwords.words('indonesian')) | frozenset(stopwords.words('english'))
+
+
+def load_resources():
+    get_stemmer()
+    get_stopwords()
+
+
+def __getattr__(name):
+    # Kompatibilitas untuk kode lama yang mengakses atribut modul langsung
+    if name == "stemmer":
+        return get_stemmer()
+    if name == "all_stop":
+        return get_stopwords()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Ikut masuk ke key artifact cache (src/artifact_store.py):
+# ubah "version" setiap kali hasil preprocess() berubah
+PREPROCESS_CONFIG = {
+    "version": 1,
+    "stopwords": ["indonesian", "english"],
+    "min_token_len": 3,
+    "stem_lang": "id",
+}
+
+# =========================
+# REGEX (DIKOMPILASI SEKALI)
+# =========================
+URL_RE = re.compile(r'http\S+|www\S+')
+NON_ALPHA_RE = re.compile(r'[^a-z\s]')
+SPACE_RE = re.compile(r'\s+')
+
+# Setelah dibersihkan, teks hanya berisi [a-z] dan satu spasi, jadi
+# word_tokenize() setara dengan split() kecuali kontraksi Inggris berikut
+# yang tetap dipecah oleh tokenizer Treebank walau tanpa tanda baca
+CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+# =========================
+# CACHE
+# =========================
+STEM_CACHE_SIZE = 200_000
+LANG_CACHE_SIZE = 100_000
+
+_lang_cache = OrderedDict()
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_token(token):
+    return get_stemmer().stem(token)
+
+
+def detect_lang(text):
+    key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    lang = _lang_cache.get(key)
+    if lang is not None:
+        _lang_cache.move_to_end(key)
+        return lang
+
+    from langdetect import detect
 
     try:
         lang = detect(text)
-    except:
+    except Exception:
         lang = 'id'
 
-    tokens = word_tokenize(text)
-    tokens = [t for t in tokens if t not in all_stop and len(t) > 2]
+    _lang_cache[key] = lang
+    if len(_lang_cache) > LANG_CACHE_SIZE:
+        _lang_cache.popitem(last=False)
+
+    return lang
+
+
+def clear_caches():
+    stem_token.cache_clear()
+    _lang_cache.clear()
+
+
+# =========================
+# PREPROCESS
+# =========================
+def clean_text(text):
+    text = str(text).lower()
+    text = URL_RE.sub(' ', text)
+    text = NON_ALPHA_RE.sub(' ', text)
+    return SPACE_RE.sub(' ', text).strip()
+
+
+def tokenize(text):
+    tokens = []
+    for t in text.split():
+        parts = CONTRACTIONS.get(t)
+        if parts:
+            tokens.extend(parts)
+        else:
+            tokens.append(t)
+    return tokens
+
+
+def preprocess(text):
+    all_stop = get_stopwords()
+
+    text = clean_text(text)
+    lang = detect_lang(text)
+
+    tokens = [t for t in tokenize(text) if t not in all_stop and len(t) > 2]
 
     if lang == 'id':
-        tokens = [stemmer.stem(t) for t in tokens]
+        tokens = [stem_token(t) for t in tokens]
 
     return " ".join(tokens)
+
+
+def preprocess_batch(texts):
+    # Review duplikat (copy-paste, spam) cukup diproses sekali
+    done = {}
+    out = []
+    with instrumentation.stage("preprocess_batch"):
+        for text in texts:
+            key = str(text)
+            result = done.get(key)
+            if result is None:
+                result = done[key] = preprocess(key)
+            out.append(result)
+    instrumentation.count("preprocess.texts", len(out))
+    instrumentation.count("preprocess.unique", len(done))
+    return out
+
+
+# =========================
+# PARALLEL PREPROCESS
+# =========================
+DEFAULT_CHUNK_SIZE = 256
+
+
+def default_workers():
+    env = os.environ.get("PREPROCESS_WORKERS")
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def init_worker(lang_seed=None):
+    # Stemmer & stopword dibuat sekali per worker sebelum chunk pertama;
+    # seed opsional membuat langdetect deterministik antar proses
+    load_resources()
+    if lang_seed is not None:
+        from langdetect import DetectorFactory
+        DetectorFactory.seed = lang_seed
+
+
+def _preprocess_chunk(texts):
+    return preprocess_batch(texts)
+
+
+def preprocess_parallel(texts, n_workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                        lang_seed=None):
+    texts = [str(t) for t in texts]
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    n_workers = default_workers() if n_workers is None else n_workers
+    n_workers = min(n_workers, len(chunks))
+
+    if n_workers <= 1:
+        init_worker(lang_seed)
+        return preprocess_batch(texts)
+
+    instrumentation.count("preprocess.parallel_chunks", len(chunks))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_worker,
+            initargs=(lang_seed,)
+        ) as pool:
+            # map() mengembalikan hasil sesuai urutan chunk input
+            results = list(pool.map(_preprocess_chunk, chunks))
+    except (OSError, BrokenProcessPool):
+        # Lingkungan tanpa dukungan multiprocessing -> jalankan serial
+        init_worker(lang_seed)
+        return preprocess_batch(texts)
+
+    return [r for chunk in results for r in chunk]
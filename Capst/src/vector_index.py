@@ -0,0 +1,237 @@
+import os
+import json
+import numpy as np
+
+INDEX_META = "index.json"
+
+
+def normalize_rows(x):
+    x = np.asarray(x, dtype=np.float32)
+    if x.ndim == 1:
+        x = x[None, :]
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def top_k_rows(scores, k):
+    # top-k per baris (skor menurun) untuk matriks (m, n)
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+# =========================
+# EXACT INDEX
+# =========================
+class ExactIndex:
+    # Matriks float32 yang sudah dinormalisasi; cosine = dot product
+    kind = "exact"
+    approximate = False
+
+    def __init__(self, vectors, normalized=False):
+        self.vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize_rows(vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def score_all(self, queries):
+        return normalize_rows(queries) @ self.vectors.T
+
+    def search(self, queries, k):
+        return top_k_rows(self.score_all(queries), k)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        with open(os.path.join(path, INDEX_META), "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+        return cls(vectors, normalized=True)
+
+
+# =========================
+# IVF INDEX (NUMPY)
+# =========================
+class IVFIndex:
+    # Inverted file: spherical k-means membagi vektor ke n_lists sel.
+    # Query hanya dibandingkan dengan vektor di n_probe sel terdekat.
+    kind = "ivf"
+    approximate = True
+
+    def __init__(self, vectors, n_lists=None, n_probe=8, n_iter=15, seed=42,
+                 normalized=False, centroids=None, list_ids=None, offsets=None):
+        self.vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize_rows(vectors)
+        self.n_probe = n_probe
+
+        if centroids is None:
+            n = len(self.vectors)
+            n_lists = n_lists or max(1, int(np.sqrt(n)))
+            centroids, assign = self._kmeans(self.vectors, min(n_lists, n), n_iter, seed)
+            list_ids = np.argsort(assign, kind="stable")
+            offsets = np.searchsorted(assign[list_ids], np.arange(len(centroids) + 1))
+
+        self.centroids = centroids
+        self.list_ids = list_ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @staticmethod
+    def _assign(x, centroids, chunk_size=65536):
+        out = np.empty(len(x), dtype=np.int64)
+        for s in range(0, len(x), chunk_size):
+            out[s:s + chunk_size] = np.argmax(x[s:s + chunk_size] @ centroids.T, axis=1)
+        return out
+
+    @classmethod
+    def _kmeans(cls, x, k, n_iter, seed):
+        rng = np.random.default_rng(seed)
+        centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assign = cls._assign(x, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, x)
+            counts = np.bincount(assign, minlength=k)
+
+            empty = counts == 0
+            if empty.any():
+                # Sel kosong diisi ulang dengan titik acak
+                sums[empty] = x[rng.choice(len(x), size=int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+
+        return centroids, cls._assign(x, centroids)
+
+    def score_all(self, queries):
+        return normalize_rows(queries) @ self.vectors.T
+
+    def candidates(self, query, n_probe=None):
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        cell_scores = self.centroids @ query
+        cells = np.argpartition(-cell_scores, n_probe - 1)[:n_probe]
+        return np.concatenate([
+            self.list_ids[self.offsets[c]:self.offsets[c + 1]] for c in cells
+        ])
+
+    def search(self, queries, k, n_probe=None):
+        queries = normalize_rows(queries)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+
+        for i, q in enumerate(queries):
+            cand = self.candidates(q, n_probe)
+            cand_scores = self.vectors[cand] @ q
+            top, top_scores = top_k_rows(cand_scores[None, :], k)
+            ids[i, :top.shape[1]] = cand[top[0]]
+            scores[i, :top.shape[1]] = top_scores[0]
+
+        return ids, scores
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ("vectors", "centroids", "list_ids", "offsets"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, INDEX_META), "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind, "n_probe": self.n_probe}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, INDEX_META), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in ("vectors", "centroids", "list_ids", "offsets")
+        }
+        return cls(normalized=True, n_probe=meta["n_probe"], **arrays)
+
+
+# =========================
+# CHUNK INDEX (MAX-SIM)
+# =========================
+class ChunkIndex:
+    # Skor toko = cosine maksimum antara query dan chunk review toko tersebut
+    # (offsets[i]:offsets[i+1] = chunk milik toko i); vectors = embedding
+    # pooled per toko, hanya dipakai sebagai representasi toko
+    kind = "chunk"
+    approximate = False
+
+    def __init__(self, vectors, chunk_vectors, offsets, normalized=False):
+        self.vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize_rows(vectors)
+        self.chunk_vectors = (
+            np.asarray(chunk_vectors, dtype=np.float32) if normalized else normalize_rows(chunk_vectors)
+        )
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def score_all(self, queries):
+        sims = normalize_rows(queries) @ self.chunk_vectors.T
+        return np.maximum.reduceat(sims, self.offsets[:-1], axis=1)
+
+    def search(self, queries, k):
+        return top_k_rows(self.score_all(queries), k)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ("vectors", "chunk_vectors", "offsets"):
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, INDEX_META), "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in ("vectors", "chunk_vectors", "offsets")
+        }
+        return cls(normalized=True, **arrays)
+
+
+INDEX_TYPES = {"exact": ExactIndex, "ivf": IVFIndex, "chunk": ChunkIndex}
+
+
+def build_index(vectors, kind="exact", **kwargs):
+    return INDEX_TYPES[kind](vectors, **kwargs)
+
+
+def open_ivf(artifact_dir, embeddings, n_lists=None, n_probe=8, mmap=True):
+    # k-means IVF dijalankan sekali lalu disimpan di samping artifact
+    # (seperti open_store); n_probe hanya dipakai saat query, bukan bagian
+    # dari file
+    try:
+        from src.artifact_store import replace_atomic
+    except ModuleNotFoundError:
+        from artifact_store import replace_atomic
+    path = os.path.join(artifact_dir, f"ivf_{n_lists or 'auto'}")
+    if not os.path.exists(os.path.join(path, INDEX_META)):
+        replace_atomic(path, IVFIndex(embeddings, n_lists=n_lists, n_probe=n_probe).save)
+    index = IVFIndex.load(path, mmap=mmap)
+    index.n_probe = n_probe
+    return index
+
+
+def load_index(path, mmap=True):
+    with open(os.path.join(path, INDEX_META), encoding="utf-8") as f:
+        kind = json.load(f)["kind"]
+    if kind == "quantized":
+        try:
+            from src.embedding_store import EmbeddingStore
+        except ModuleNotFoundError:
+            from embedding_store import EmbeddingStore
+        return EmbeddingStore.load(path, mmap=mmap)
+    return INDEX_TYPES[kind].load(path, mmap=mmap)
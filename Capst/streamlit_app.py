@@ -4,12 +4,19 @@
 
 import sys
 import os
+import math
+import itertools
 import urllib.parse
+import numpy as np
 import streamlit as st
 import joblib
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
-from src.recommender import build_recommender, recommend
+from src.engine import RecommenderEngine, DEFAULT_WEIGHTS
+from src.api_client import RecommenderClient
+from src import instrumentation
+from src.kmodes_predictor import KModesPredictor
+from src.query_cache import QueryCache, normalize_query
 
 st.set_page_config(
     page_title="COFFE SHOP FINDER JOGJA",
@@ -147,15 +154,47 @@ input, textarea {
 # =========================================================
 # LOAD MODEL
 # =========================================================
+# Ranking dihitung sekali sedalam RESULT_DEPTH; "tampilkan lebih banyak"
+# hanya menambah PAGE_SIZE kartu dari hasil yang sama
+PAGE_SIZE = 5
+RESULT_DEPTH = 30
+RESULT_CACHE_SIZE = 512
+MAX_ANSWER_COMBINATIONS = 100_000
+
 @st.cache_resource
 def load_resources():
+    # RECOMMENDER_METRICS / RECOMMENDER_PROFILE_DIR -> timing per stage
+    instrumentation.configure_from_env()
     base_dir = os.path.join(os.path.dirname(__file__), "models")
-    kmodes = joblib.load(os.path.join(base_dir, "kmodes_model.pkl"))
+    kmodes = KModesPredictor.load(os.path.join(base_dir, "kmodes_predictor.npz"))
     category_mappings = joblib.load(os.path.join(base_dir, "category_mappings.pkl"))
-    df, tfidf, tfidf_matrix, sbert, embeddings = build_recommender()
-    return kmodes, category_mappings, df, tfidf, tfidf_matrix, sbert, embeddings
 
-kmodes, category_mappings, df, tfidf, tfidf_matrix, sbert, embeddings = load_resources()
+    # Pilihan jawaban per pertanyaan (urutan kolom predictor) dan cluster
+    # untuk setiap kombinasi jawaban, dihitung sekali untuk semua sesi
+    options = {col: list(category_mappings[col].values()) for col in kmodes.columns}
+    clusters = {}
+    if math.prod(len(v) for v in options.values()) <= MAX_ANSWER_COMBINATIONS:
+        combos = list(itertools.product(*options.values()))
+        codes = np.array([kmodes.encode(list(c)) for c in combos])
+        clusters = dict(zip(combos, kmodes.predict(codes).tolist()))
+
+    # RECOMMENDER_API_URL diisi -> rekomendasi dihitung oleh src/serving.py,
+    # worker streamlit tidak memuat SBERT / artifact sendiri
+    api_url = os.environ.get("RECOMMENDER_API_URL")
+    if api_url:
+        engine = RecommenderClient(api_url)
+        artifact_version = engine.health().get("artifact")
+    else:
+        engine = RecommenderEngine.build(catalogue=True)
+        artifact_version = engine.artifact_key
+    return kmodes, options, clusters, engine, artifact_version
+
+@st.cache_resource
+def result_cache():
+    # Hasil rekomendasi dipakai bersama oleh semua sesi (LRU berukuran tetap)
+    return QueryCache(maxsize=RESULT_CACHE_SIZE)
+
+kmodes, options, clusters, engine, artifact_version = load_resources()
 
 # =========================================================
 # SEGMENT INFO (ASLI PUNYAMU)
@@ -187,12 +226,12 @@ with st.form("user_form"):
     col1, col2 = st.columns(2)
 
     with col1:
-        tujuan = st.selectbox("Tujuan Kunjungan", list(category_mappings["Tujuan utama Anda ke coffee shop?"].values()))
-        faktor = st.selectbox("Faktor Penentu", list(category_mappings["Faktor utama yang paling memengaruhi Anda dalam memilih coffee shop"].values()))
+        tujuan = st.selectbox("Tujuan Kunjungan", options["Tujuan utama Anda ke coffee shop?"])
+        faktor = st.selectbox("Faktor Penentu", options["Faktor utama yang paling memengaruhi Anda dalam memilih coffee shop"])
 
     with col2:
-        minuman = st.selectbox("Minuman Favorit", list(category_mappings["Jenis minuman yang paling sering Anda pesan di coffee shop"].values()))
-        duduk = st.selectbox("Tempat Duduk Favorit", list(category_mappings["Jenis tempat duduk favorit Anda"].values()))
+        minuman = st.selectbox("Minuman Favorit", options["Jenis minuman yang paling sering Anda pesan di coffee shop"])
+        duduk = st.selectbox("Tempat Duduk Favorit", options["Jenis tempat duduk favorit Anda"])
 
     kebutuhan = st.text_input("Kebutuhan khusus", placeholder="wifi kencang, banyak colokan")
     area = st.text_input("Area (opsional)", placeholder="Gejayan, Jakal, UGM")
@@ -204,19 +243,55 @@ st.markdown('</div>', unsafe_allow_html=True)
 # =========================================================
 # OUTPUT
 # =========================================================
+def show_more():
+    st.session_state["shown"] += PAGE_SIZE
+
+def field(row, key, fmt="{}", empty="-"):
+    # Area / alamat / rating bisa kosong (null di katalog, None dari API)
+    value = row.get(key)
+    if value is None or value != value:
+        return empty
+    return fmt.format(value)
+
 if submitted:
-    encoded = []
-    for col, val in {
+    answers = {
         "Tujuan utama Anda ke coffee shop?": tujuan,
         "Faktor utama yang paling memengaruhi Anda dalam memilih coffee shop": faktor,
         "Jenis minuman yang paling sering Anda pesan di coffee shop": minuman,
         "Jenis tempat duduk favorit Anda": duduk
-    }.items():
-        rev = {v: k for k, v in category_mappings[col].items()}
-        encoded.append(rev[val])
+    }
+    answers = tuple(answers[col] for col in kmodes.columns)
+    key = (answers, normalize_query(kebutuhan), normalize_query(area),
+           RESULT_DEPTH, DEFAULT_WEIGHTS, artifact_version)
+
+    with instrumentation.request("streamlit_submit"):
+        hit = result_cache().get(key)
+        if hit is None:
+            with instrumentation.stage("kmodes_predict"):
+                cluster = clusters.get(answers)
+                if cluster is None:
+                    cluster = kmodes.predict_one(list(answers))
+            results = engine.recommend(
+                kebutuhan, segment_info[cluster]["name"], area, *DEFAULT_WEIGHTS, top_k=RESULT_DEPTH
+            )
+            hit = (cluster, results)
+            result_cache().put(key, hit)
+        else:
+            instrumentation.count("result_cache_hit")
+
+    # Hasil disimpan di sesi: tombol "tampilkan lebih banyak" (rerun) tidak
+    # menghitung ulang ranking
+    st.session_state["result"] = hit
+    st.session_state["shown"] = PAGE_SIZE
+
+# st.fragment (streamlit >= 1.37): klik tombol hanya me-render ulang bagian hasil
+fragment = getattr(st, "fragment", None) or (lambda fn: fn)
 
-    cluster = kmodes.predict([encoded])[0]
+@fragment
+def render_results():
+    cluster, results = st.session_state["result"]
     seg = segment_info[cluster]
+    shown = st.session_state["shown"]
 
     st.markdown(f"""
     <div class="segment-card">
@@ -225,12 +300,10 @@ if submitted:
     </div>
     """, unsafe_allow_html=True)
 
-    results = recommend(df, tfidf, tfidf_matrix, sbert, embeddings, kebutuhan, seg["name"], area, 5)
-
     st.markdown('<div class="rec-title"> ☕ Rekomendasi Coffee Shop</div>', unsafe_allow_html=True)
 
-    for i, (_, row) in enumerate(results.iterrows(), 1):
-        query = urllib.parse.quote(f"{row['name']} {row['area']} Yogyakarta")
+    for i, (_, row) in enumerate(results.iloc[:shown].iterrows(), 1):
+        query = urllib.parse.quote(" ".join(filter(None, [row['name'], field(row, 'area', empty=""), "Yogyakarta"])))
         maps = f"https://www.google.com/maps/search/?api=1&query={query}"
 
         if i == 1:
@@ -238,8 +311,8 @@ if submitted:
             <div class="top1-card">
                 <div class="top-badge">🏆 TOP 1</div>
                 <h2>{row['name']}</h2>
-                <p>⭐ {row['rating']:.2f} | 📍 {row['area']}</p>
-                <p>{row['address']}</p>
+                <p>⭐ {field(row, 'rating', '{:.2f}')} | 📍 {field(row, 'area')}</p>
+                <p>{field(row, 'address')}</p>
                 <a href="{maps}" target="_blank" class="maps-link">📍 Petunjuk Lokasi</a>
             </div>
             """, unsafe_allow_html=True)
@@ -248,11 +321,17 @@ if submitted:
             <div class="recom-card">
                 <div class="recom-badge">TOP {i}</div>
                 <h4>{row['name']}</h4>
-                <p>⭐ {row['rating']:.2f} | 📍 {row['area']}</p>
-                <p>{row['address']}</p>
+                <p>⭐ {field(row, 'rating', '{:.2f}')} | 📍 {field(row, 'area')}</p>
+                <p>{field(row, 'address')}</p>
                 <a href="{maps}" target="_blank" class="maps-link">📍 Petunjuk Lokasi</a>
             </div>
             """, unsafe_allow_html=True)
 
+    if shown < len(results):
+        st.button("Tampilkan lebih banyak", on_click=show_more)
+
+if "result" in st.session_state:
+    render_results()
+
 st.markdown('<div class="watermark">By Angel & Thania</div>', unsafe_allow_html=True)
 st.markdown('<div class="footer-text">Model menggunakan K-Modes Clustering, TF-IDF, Sentence-BERT, dan keyword-based segmentation.</div>', unsafe_allow_html=True)
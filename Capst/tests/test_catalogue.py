@@ -0,0 +1,40 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.area_index import AreaIndex
+from src.catalogue import CATALOGUE_FILE, Catalogue, write_catalogue
+
+
+def make_df():
+    return pd.DataFrame({
+        "name": ["Kopi A", "Kopi B", "Kopi C"],
+        "area": ["Sleman", np.nan, "Sleman"],
+        "address": ["Jl. Kaliurang", np.nan, None],
+        "rating": [4.5, 4.0, np.nan],
+    })
+
+
+def test_missing_address_and_area_stored_as_null(tmp_path):
+    path = write_catalogue(str(tmp_path / CATALOGUE_FILE), make_df())
+    cat = Catalogue.load(path)
+
+    assert cat.table.column("address").to_pylist() == ["Jl. Kaliurang", None, None]
+    assert cat.table.column("area").null_count == 1
+    assert cat.area_names == ["Sleman"]
+    assert cat.area_codes.tolist() == [0, -1, 0]
+
+    frame = cat.frame()
+    assert frame["address"].isna().tolist() == [False, True, True]
+    assert np.isnan(frame["rating"].iloc[2])
+
+
+def test_area_index_skips_missing_area():
+    index = AreaIndex(["Sleman", None, np.nan, "Depok "])
+    assert index.keys == ["", "depok", "sleman"]
+    assert index.lookup("none").tolist() == []
+    assert index.lookup("sleman").tolist() == [0]
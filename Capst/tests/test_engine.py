@@ -0,0 +1,121 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+os.environ.setdefault("NLTK_OFFLINE", "1")
+
+from src.recommender import CSV_PATH, build_recommender, recommend
+from src.data_loader import load_reviews, REVIEW_COLUMNS, CSV_OPTIONS
+from src.engine import RecommenderEngine
+from src.embedding import HashingEncoder
+
+QUERIES = [
+    ("kopi enak tempat nyaman", "Productive Work / Study", None, 5),
+    ("wifi kencang colokan banyak", None, None, 5),
+    ("", "Instagrammable & Aesthetic", None, 5),
+    ("", None, None, 10),
+    ("kopi susu", "Premium Coffee Enthusiast", "jakal", 5),
+    ("", "Casual Coffee Drinker (Lokal)", "jakal", 500),
+    ("kopi", None, "tidak ada area ini", 5),
+]
+
+
+def write_corpus(path, unrated_shop=False):
+    df = load_reviews(CSV_PATH)
+    if unrated_shop:
+        # Toko baru yang semua review-nya tanpa rating -> rating NaN
+        df = pd.concat([df, pd.DataFrame({
+            "area": ["Jakal", "Jakal"],
+            "name": ["Kopi Baru", "Kopi Baru"],
+            "rating": [np.nan, np.nan],
+            "address": ["Jl. Kaliurang", None],
+            "review_text": ["kopi enak tempat nyaman wifi kencang", "tempat luas cocok buat nugas"],
+        })], ignore_index=True)
+    df[REVIEW_COLUMNS].to_csv(path, index=False, **CSV_OPTIONS)
+    return path
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["rated", "unrated_shop"])
+def corpus(request, tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("corpus")
+    csv_path = write_corpus(str(tmp / "reviews.csv"), unrated_shop=request.param)
+    kwargs = dict(csv_path=csv_path, cache_dir=str(tmp / "artifacts"), encoder=HashingEncoder())
+    return kwargs, build_recommender(**kwargs)
+
+
+def assert_same_ranking(got, artifacts, user_text, segment, lokasi, top_k):
+    expected = recommend(*artifacts, user_text, segment, lokasi, top_k=top_k)
+    assert len(got) == len(expected)
+    if expected.empty:
+        return
+    np.testing.assert_allclose(
+        got["score"].to_numpy(dtype=float), expected["score"].to_numpy(dtype=float), atol=1e-5
+    )
+    # Toko yang dikembalikan harus punya skor yang sama di recommend() lama
+    # (urutan di antara skor seri boleh berbeda)
+    full = recommend(*artifacts, user_text, segment, lokasi, top_k=len(artifacts[0]))
+    legacy_score = dict(zip(full["name"], full["score"]))
+    np.testing.assert_allclose(
+        [legacy_score[name] for name in got["name"]], got["score"].to_numpy(dtype=float), atol=1e-5
+    )
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_recommend_matches_legacy(corpus, query):
+    _, artifacts = corpus
+    engine = RecommenderEngine(*artifacts)
+    text, segment, lokasi, top_k = query
+    got = engine.recommend(text, segment, lokasi, top_k=top_k)
+    assert_same_ranking(got, artifacts, *query)
+
+
+def test_recommend_batch_matches_legacy(corpus):
+    _, artifacts = corpus
+    engine = RecommenderEngine(*artifacts)
+    results = engine.recommend_batch(
+        [{"user_text": t, "segment": s, "lokasi": l, "top_k": k} for t, s, l, k in QUERIES]
+    )
+    for got, query in zip(results, QUERIES):
+        assert_same_ranking(got, artifacts, *query)
+
+
+def test_catalogue_engine_matches_legacy(corpus):
+    kwargs, artifacts = corpus
+    engine = RecommenderEngine.build(catalogue=True, **kwargs)
+    assert engine.df is None
+    for query in QUERIES:
+        text, segment, lokasi, top_k = query
+        assert_same_ranking(engine.recommend(text, segment, lokasi, top_k=top_k), artifacts, *query)
+
+
+def test_unrated_shop_ranks_last():
+    from src.engine import minmax, top_k_indices
+
+    norm = minmax(np.array([3.0, np.nan, 5.0]))
+    assert norm[0] == 0.0 and np.isnan(norm[1]) and norm[2] == pytest.approx(1.0)
+    assert top_k_indices(np.array([0.5, np.nan, 0.9, 0.1]), 4).tolist() == [2, 0, 3, 1]
+
+
+class RecordingEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def encode(self, texts, *args, **kwargs):
+        self.seen.extend(texts)
+        return super().encode(texts, *args, **kwargs)
+
+
+def test_encode_queries_uses_original_text(corpus):
+    _, (df, tfidf, tfidf_matrix, _, embeddings) = corpus
+    encoder = RecordingEncoder()
+    engine = RecommenderEngine(df, tfidf, tfidf_matrix, encoder, embeddings)
+    # Key cache sama ("kopi susu"), tapi yang di-encode teks asli kemunculan pertama
+    engine.encode_queries(["Kopi  SUSU", "kopi susu", "WiFi Kencang"])
+    assert encoder.seen == ["Kopi  SUSU", "WiFi Kencang"]
+    engine.encode_queries(["KOPI SUSU"])
+    assert encoder.seen == ["Kopi  SUSU", "WiFi Kencang"]
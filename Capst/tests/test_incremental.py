@@ -0,0 +1,61 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+os.environ.setdefault("NLTK_OFFLINE", "1")
+
+from src.recommender import CSV_PATH, build_artifacts
+from src.data_loader import load_reviews, REVIEW_COLUMNS, CSV_OPTIONS
+from src.incremental import IncrementalRecommender
+from src.embedding import HashingEncoder
+
+CHUNK_TOKENS = 40
+
+
+@pytest.fixture(scope="module")
+def split_corpus(tmp_path_factory):
+    # ~15% review + semua review 3 toko jadi batch baru (toko lama & toko baru)
+    tmp = tmp_path_factory.mktemp("incremental")
+    df = load_reviews(CSV_PATH)
+    mask = np.random.default_rng(0).random(len(df)) < 0.15
+    mask |= df["name"].isin(df["name"].drop_duplicates().iloc[:3]).to_numpy()
+    old, new = df[~mask], df[mask]
+
+    old_csv, full_csv = str(tmp / "old.csv"), str(tmp / "full.csv")
+    old[REVIEW_COLUMNS].to_csv(old_csv, index=False, **CSV_OPTIONS)
+    pd.concat([old, new])[REVIEW_COLUMNS].to_csv(full_csv, index=False, **CSV_OPTIONS)
+    return old_csv, full_csv, new[REVIEW_COLUMNS], str(tmp / "artifacts")
+
+
+@pytest.mark.parametrize("embedding_mode", ["concat", "chunk"])
+def test_add_reviews_matches_full_rebuild(split_corpus, embedding_mode):
+    old_csv, full_csv, new, cache_dir = split_corpus
+    kwargs = dict(cache_dir=cache_dir, encoder=HashingEncoder(),
+                  embedding_mode=embedding_mode, chunk_tokens=CHUNK_TOKENS)
+
+    inc = IncrementalRecommender.build(csv_path=old_csv, refit_ratio=2.0, **kwargs)
+    stats = inc.add_reviews(new)
+    assert stats["new_shops"] > 0 and stats["updated_shops"] > 0
+    full = build_artifacts(csv_path=full_csv, **kwargs)
+
+    # Toko baru ditambahkan di akhir; bandingkan per nama
+    row = {name: i for i, name in enumerate(inc.df["name"])}
+    order = [row[name] for name in full["df"]["name"]]
+    assert len(order) == len(inc.df)
+    got = inc.df.iloc[order]
+
+    assert got["clean_review"].tolist() == full["df"]["clean_review"].tolist()
+    np.testing.assert_allclose(
+        got["rating"].to_numpy(dtype=float), full["df"]["rating"].to_numpy(dtype=float)
+    )
+    np.testing.assert_allclose(inc.embeddings[order], np.asarray(full["embeddings"]), atol=1e-6)
+
+    # Setelah refit, TF-IDF sama dengan fit penuh
+    inc.refit()
+    np.testing.assert_allclose(
+        inc.tfidf_matrix[order].toarray(), full["tfidf_matrix"].toarray(), atol=1e-9
+    )
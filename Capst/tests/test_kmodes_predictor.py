@@ -0,0 +1,47 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from kmodes.kmodes import KModes
+from src.kmodes_predictor import KModesPredictor
+
+COLUMNS = ["tujuan", "faktor", "minuman", "kursi"]
+N_CATEGORIES = [5, 6, 4, 3]
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(42)
+    X = np.column_stack([rng.integers(0, n, 300) for n in N_CATEGORIES])
+    km = KModes(n_clusters=4, init="Huang", n_init=5, random_state=42).fit(X)
+    mappings = {
+        col: {code: f"{col} {code}" for code in range(n)}
+        for col, n in zip(COLUMNS, N_CATEGORIES)
+    }
+    return km, mappings, rng
+
+
+def test_predict_matches_kmodes(fitted):
+    km, mappings, rng = fitted
+    predictor = KModesPredictor.from_kmodes(km, mappings)
+    # Semua kombinasi jawaban, termasuk jarak seri ke beberapa centroid
+    grid = np.stack(np.meshgrid(*[np.arange(n) for n in N_CATEGORIES]), -1).reshape(-1, len(COLUMNS))
+    np.testing.assert_array_equal(predictor.predict(grid), km.predict(grid))
+
+
+def test_predict_one_and_saved_predictor(fitted, tmp_path):
+    km, mappings, rng = fitted
+    path = KModesPredictor.from_kmodes(km, mappings).save(str(tmp_path / "predictor.npz"))
+    predictor = KModesPredictor.load(path)
+
+    X = np.column_stack([rng.integers(0, n, 50) for n in N_CATEGORIES])
+    expected = km.predict(X)
+    np.testing.assert_array_equal(predictor.predict(X), expected)
+    for row, label in zip(X, expected):
+        answers = {col: mappings[col][code] for col, code in zip(COLUMNS, row)}
+        assert predictor.predict_one(answers) == label
+        assert predictor.predict_one([answers[col] for col in COLUMNS]) == label
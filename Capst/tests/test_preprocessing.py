@@ -0,0 +1,42 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+os.environ.setdefault("NLTK_OFFLINE", "1")
+
+from src.recommender import CSV_PATH
+from src.data_loader import load_reviews
+from src import text_preprocessing as tp
+
+LANG_SEED = 0
+
+
+@pytest.fixture(scope="module")
+def texts():
+    reviews = load_reviews(CSV_PATH)["review_text"].tolist()[:400]
+    # Duplikat, non-string, URL, angka, dan kontraksi Inggris
+    return reviews + reviews[:25] + [
+        np.nan, 12345, "", "   ", "cek https://kopi.id dulu!!", "I wanna gonna cannot",
+    ]
+
+
+@pytest.fixture(scope="module")
+def expected(texts):
+    tp.init_worker(LANG_SEED)
+    tp.clear_caches()
+    return [tp.preprocess(t) for t in texts]
+
+
+def test_preprocess_batch_matches_preprocess(texts, expected):
+    tp.clear_caches()
+    assert tp.preprocess_batch(texts) == expected
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_preprocess_parallel_matches_preprocess(texts, expected, n_workers):
+    tp.clear_caches()
+    got = tp.preprocess_parallel(texts, n_workers=n_workers, chunk_size=64, lang_seed=LANG_SEED)
+    assert got == expected